@@ -1,21 +1,26 @@
 #!/usr/bin/python
 # programmer : Daofeng
 # usage: adds an additional column that contains transcript class to gencode raw data files
+# python3 add_transcriptClass.py [attrs file] [comp file] [output file], '-' for stdin/stdout
 
 import sys
+from stream_io import open_input, open_output
 
 def main():
+    attrsfile = sys.argv[1] if len(sys.argv) > 1 else 'wgEncodeGencodeAttrsV47lift37.txt'
+    compfile = sys.argv[2] if len(sys.argv) > 2 else 'wgEncodeGencodeCompV47lift37.txt'
+    outfile = sys.argv[3] if len(sys.argv) > 3 else 'wgEncodeGencodeCompV47lift37.with_transcriptClass.txt'
     d = {} # key: transcription id, value: transcriptClass
-    with open('wgEncodeGencodeAttrsV47lift37.txt') as fin:
+    with open_input(attrsfile) as fin:
         for line in fin:
             t = line.strip().split('\t')
             d[t[4]] = t[12]
-    with open('wgEncodeGencodeCompV47lift37.txt',"r") as infile:
-        with open('wgEncodeGencodeCompV47lift37.with_transcriptClass.txt','w') as outfile:
+    with open_input(compfile) as infile:
+        with open_output(outfile) as fout:
             for line in infile:
                 line = line.strip()
                 t = line.split('\t')
-                outfile.write('{}\t{}\n'.format(line, d[t[1]]))
+                fout.write('{}\t{}\n'.format(line, d[t[1]]))
 
 if __name__=="__main__":
     main()
@@ -1,60 +1,133 @@
-import sys,glob,gzip,os
+import sys,os
+from axt_utils import read_chrsize, read_axt, query_range, block_stats, split, SegmentChainer, chain_segments
+from stream_io import open_input
 
 # axt format: http://genome.ucsc.edu/goldenPath/help/axt.html
+# the axt file can be '-' for stdin, gzip/BGZF or zstd compressed
+# with a 4th argument the same alignment is also written keyed on the query genome, in the
+# same pass over the axt file, so the pair can be browsed from both genomes
+# each record carries identity, mismatch and indel counts and the mismatch columns of its block
+# (see block_stats in axt_utils.py) so the browser can draw and filter without scanning sequences
+# --split-gap N breaks blocks at gaps of N or more bases while they stream past, the same way
+# axtSplit.py does, instead of writing a split axt file and converting that one
+# --synteny <file> also chains collinear blocks (same query chromosome and strand, in the same
+# order on both genomes) into synteny segments for zoomed out views, one level per gap size in
+# SYNTENY_GAPS, each level built from the one below. the first level is chained while the blocks
+# stream past (axt files are ordered by target), so only its segments are kept in memory for the
+# levels above. every level gets its own sorted and tabix indexed file, the gap size goes before
+# the .gz: hg38ToMm10.synteny.gz gives hg38ToMm10.synteny.10000.gz, hg38ToMm10.synteny.100000.gz
+# and hg38ToMm10.synteny.1000000.gz, so a wide view reads only the level it draws. records are keyed on the target genome:
+#   chr1  1000  250000  id:1,synteny:{level:1,chr:"chr3",start:5000,stop:260000,strand:"+",blockCount:42,identity:87.5}
 
-if len(sys.argv)!=4:
-    print('python3 axt2align.py <chr size file> <axt file> <output file>')
+SYNTENY_GAPS = [10000, 100000, 1000000]
+
+split_gap = None
+if '--split-gap' in sys.argv:
+    i = sys.argv.index('--split-gap')
+    split_gap = int(sys.argv[i + 1])
+    del sys.argv[i:i + 2]
+
+synteny_file = None
+if '--synteny' in sys.argv:
+    i = sys.argv.index('--synteny')
+    synteny_file = sys.argv[i + 1]
+    del sys.argv[i:i + 2]
+
+if len(sys.argv) not in (4, 5):
+    print('python3 axt2align.py [--split-gap N] [--synteny <synteny output file>] <chr size file> <axt file> <output file> [query output file]')
     sys.exit()
 
-chrsize={}
-with open(sys.argv[1]) as fin:
-    for line in fin:
-        lst=line.rstrip().split('\t')
-        chrsize[lst[0]]=int(lst[1])
-
-f=sys.argv[2]
-OF=sys.argv[3][:-3]
-
-fout=open(OF,'w')
-
-id=1
-
-fin = gzip.GzipFile(f,'r') if f[-3:] == ".gz" else open(f,'r')
-
-line=fin.readline()
-while line:
-    if line[0]!='#':
-        lst=line.rstrip().split()
-        # query start/stop
-        a=0
-        b=0
-        if lst[7]=='+':
-            a=int(lst[5])-1
-            b=lst[6]
-        else:
-            c=chrsize[lst[4]]
-            a=c-int(lst[6])
-            b=c-int(lst[5])+1
-
-        fout.write('{0[1]}\t{2}\t{0[3]}\tid:{1},genomealign:{{chr:"{0[4]}",start:{3},stop:{4},strand:"{0[7]}",targetseq:'.format(
-            lst,
-            id,
-            int(lst[2])-1,
-            a,
-            b
-            ))
-        id+=1
-        line=fin.readline().rstrip()
-        fout.write('"'+line+'",queryseq:')
-        line=fin.readline().rstrip()
-        fout.write('"'+line+'"}\n')
-        fin.readline()
-    line=fin.readline()
-
-fin.close()
-fout.close()
+COMPLEMENT = str.maketrans('ACGTNacgtn', 'TGCANtgcan')
+
+
+def revcomp(seq):
+    return seq.translate(COMPLEMENT)[::-1]
+
+
+def write_record(fout, chrom, start, end, id, other_chr, other_start, other_end, strand, targetseq, queryseq):
+    stats = block_stats(targetseq, queryseq)
+    fout.write('{0}\t{1}\t{2}\tid:{3},genomealign:{{chr:"{4}",start:{5},stop:{6},strand:"{7}",'
+               'identity:{10[identity]},mismatch:{10[mismatch]},targetGap:{10[targetGap]},queryGap:{10[queryGap]},'
+               'mismatchPos:"{10[mismatchPos]}",targetseq:"{8}",queryseq:"{9}"}}\n'.format(
+        chrom, start, end, id, other_chr, other_start, other_end, strand, targetseq, queryseq, stats))
+    return stats
+
+
+def write_synteny(SF, first_level):
+    segments = sorted(first_level, key=lambda x: (x[0], x[1]))
+    for level, gap in enumerate(SYNTENY_GAPS, 1):
+        if level > 1:
+            segments = chain_segments(segments, gap)
+        LF = '{}.{}'.format(SF, gap)
+        with open(LF, 'w') as fout:
+            for i, (chrom, start, end, qchr, qstart, qend, strand, count, aligned, matches) in enumerate(segments, 1):
+                identity = round(100.0 * matches / aligned, 2) if aligned else 0
+                fout.write('{}\t{}\t{}\tid:{},synteny:{{level:{},chr:"{}",start:{},stop:{},strand:"{}",'
+                           'blockCount:{},identity:{}}}\n'.format(chrom, start, end, i, level, qchr, qstart, qend,
+                                                                  strand, count, identity))
+        sort_and_index(LF)
+
 
+def sort_and_index(OF):
+    os.system('sort -k1,1 -k2,2n -o '+OF+' '+OF)
+    os.system('bgzip '+OF)
+    os.system('tabix -p bed '+OF+'.gz')
 
-os.system('sort -k1,1 -k2,2n -o '+OF+' '+OF)
-os.system('bgzip '+OF)
-os.system('tabix -p bed '+OF+'.gz')
+
+chrsize = read_chrsize(sys.argv[1])
+
+OF = sys.argv[3][:-3]
+QF = sys.argv[4][:-3] if len(sys.argv) == 5 else None
+SF = synteny_file[:-3] if synteny_file else None
+
+fout = open(OF, 'w')
+qout = open(QF, 'w') if QF else None
+
+id = 1
+# first synteny level, chained from the blocks as they are read
+synteny_chainer = SegmentChainer(SYNTENY_GAPS[0])
+synteny_segments = []
+
+
+def pieces(align):
+    if split_gap is None:
+        return [align]
+    # a gap at either end of a block leaves an empty piece
+    return [sub for sub in split(align, split_gap) if sub['seqs'][0]]
+
+
+with open_input(sys.argv[2]) as fin:
+    for block in read_axt(fin):
+        aligned = matches = 0
+        for align in pieces(block):
+            # query start/stop
+            a, b = query_range(align, chrsize)
+            t = align['seqs'][0]
+            q = align['seqs'][1]
+            stats = write_record(fout, align['ref_chr'], align['ref_start'] - 1, align['ref_end'], id,
+                                 align['query_chr'], a, b, align['strand'], t, q)
+            aligned += stats['aligned']
+            matches += stats['aligned'] - stats['mismatch']
+            if qout:
+                # reverse strand blocks are flipped so the sequences read along the query forward strand
+                if align['strand'] == '-':
+                    t = revcomp(t)
+                    q = revcomp(q)
+                write_record(qout, align['query_chr'], a, b, id,
+                             align['ref_chr'], align['ref_start'] - 1, align['ref_end'], align['strand'], q, t)
+            id += 1
+        if SF:
+            # chained on the whole block, the query coordinates of split pieces of - blocks do not line up
+            a, b = query_range(block, chrsize)
+            synteny_segments.extend(synteny_chainer.add(
+                [block['ref_chr'], block['ref_start'] - 1, block['ref_end'], block['query_chr'],
+                 a, b, block['strand'], 1, aligned, matches]))
+
+fout.close()
+sort_and_index(OF)
+if qout:
+    qout.close()
+    sort_and_index(QF)
+if SF:
+    synteny_segments.extend(synteny_chainer.flush())
+    write_synteny(SF, synteny_segments)
@@ -0,0 +1,193 @@
+#!/usr/bin/python
+# usage: python3 axt_liftover.py [--min-match F, default 0.95] <chr size file> <axt file or .npz index> <input bed> <output bed> [unmapped bed]
+
+# projects positions and intervals from the target genome of an axt alignment onto the
+# query genome, base by base inside gapped blocks (same coordinates axt2align.py shows).
+# the chr size file is for the query genome, like axt2align.py.
+# the alignment blocks are cut into ungapped segments and kept in sorted numpy arrays per
+# target chromosome, lookups are done with searchsorted over whole batches at once.
+# blocks are expected not to overlap on the target genome, as in net axt files.
+# use a .npz output file name to only build and save the index, it loads much faster
+# than the axt file next time.
+# an interval is mapped only when its ends keep their order on the query and at least
+# --min-match of its bases are aligned, otherwise it goes to the unmapped file.
+# axt and bed files can be '-' for stdin/stdout and compressed, see stream_io.py
+
+import sys
+import numpy as np
+from axt_utils import read_chrsize, read_axt, ungapped_segments
+from stream_io import open_input, open_output
+
+MIN_MATCH = 0.95  # default share of aligned bases an interval needs, as liftOver -minMatch
+FLIP = {'+': '-', '-': '+'}
+
+
+class AlignmentIndex:
+
+    def __init__(self, query_chroms, query_sizes, chroms):
+        # chroms: {target chrom: (tstart, qstart, length, qchr, strand)}, all arrays sorted by tstart
+        self.query_chroms = query_chroms
+        self.query_sizes = query_sizes
+        self.chroms = chroms
+
+    @classmethod
+    def from_axt(cls, axtfile, chrsize):
+        query_chroms = sorted(chrsize)
+        qchr_index = {c: i for i, c in enumerate(query_chroms)}
+        parts = {}
+        with open_input(axtfile) as fin:
+            for align in read_axt(fin):
+                tstart, qstart, length = ungapped_segments(align)
+                qchr = np.full(len(tstart), qchr_index[align['query_chr']], dtype=np.int32)
+                strand = np.full(len(tstart), 1 if align['strand'] == '+' else -1, dtype=np.int8)
+                parts.setdefault(align['ref_chr'], []).append((tstart, qstart, length, qchr, strand))
+        chroms = {}
+        for chrom, segments in parts.items():
+            arrays = [np.concatenate(x) for x in zip(*segments)]
+            order = np.argsort(arrays[0], kind='stable')
+            chroms[chrom] = tuple(a[order] for a in arrays)
+        query_sizes = np.array([chrsize[c] for c in query_chroms], dtype=np.int64)
+        return cls(query_chroms, query_sizes, chroms)
+
+    @classmethod
+    def load(cls, f):
+        data = np.load(f)
+        chroms = {}
+        for chrom in data['target_chroms']:
+            chroms[str(chrom)] = tuple(data['{}.{}'.format(chrom, k)] for k in ('tstart', 'qstart', 'length', 'qchr', 'strand'))
+        return cls([str(c) for c in data['query_chroms']], data['query_sizes'], chroms)
+
+    def save(self, f):
+        arrays = {'query_chroms': np.array(self.query_chroms), 'query_sizes': self.query_sizes,
+                  'target_chroms': np.array(list(self.chroms))}
+        for chrom, (tstart, qstart, length, qchr, strand) in self.chroms.items():
+            arrays['{}.tstart'.format(chrom)] = tstart
+            arrays['{}.qstart'.format(chrom)] = qstart
+            arrays['{}.length'.format(chrom)] = length
+            arrays['{}.qchr'.format(chrom)] = qchr
+            arrays['{}.strand'.format(chrom)] = strand
+        np.savez(f, **arrays)
+
+    def map_positions(self, chrom, positions):
+        '''
+        maps 0-based target positions on one chromosome
+        returns (query chrom index, query position, strand) arrays, chrom index is -1
+        and strand is 0 for positions outside any aligned base
+        '''
+        positions = np.asarray(positions, dtype=np.int64)
+        qchr = np.full(len(positions), -1, dtype=np.int32)
+        qpos = np.full(len(positions), -1, dtype=np.int64)
+        strand = np.zeros(len(positions), dtype=np.int8)
+        if chrom not in self.chroms or len(positions) == 0:
+            return qchr, qpos, strand
+        tstart, qstart, length, seg_qchr, seg_strand = self.chroms[chrom]
+        seg = np.searchsorted(tstart, positions, side='right') - 1
+        hit = seg >= 0
+        hit[hit] = positions[hit] < tstart[seg[hit]] + length[seg[hit]]
+        seg = seg[hit]
+        pos = qstart[seg] + (positions[hit] - tstart[seg])
+        minus = seg_strand[seg] < 0
+        # reverse strand query coordinates count from the end of the query chromosome
+        pos[minus] = self.query_sizes[seg_qchr[seg][minus]] - 1 - pos[minus]
+        qchr[hit] = seg_qchr[seg]
+        qpos[hit] = pos
+        strand[hit] = seg_strand[seg]
+        return qchr, qpos, strand
+
+    def aligned_bases(self, chrom, starts, ends):
+        '''number of target bases with an aligned query base in each 0-based half open interval'''
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        if chrom not in self.chroms:
+            return np.zeros(len(starts), dtype=np.int64)
+        tstart, _, length, _, _ = self.chroms[chrom]
+        tend = tstart + length
+        total = np.concatenate(([0], np.cumsum(length)))
+
+        def before(x):
+            # bases of the segments starting before x, less what the last of them has past x
+            k = np.searchsorted(tstart, x, side='left')
+            over = np.where(k > 0, tend[np.maximum(k - 1, 0)] - x, 0)
+            return total[k] - np.maximum(over, 0)
+
+        return before(ends) - before(starts)
+
+    def map_intervals(self, chrom, starts, ends, min_match=MIN_MATCH):
+        '''
+        maps 0-based half open target intervals on one chromosome. both ends have to land on the
+        same query chromosome and strand, in the order of that strand, so an interval across
+        blocks that are rearranged on the query is rejected, and at least min_match of its bases
+        have to be aligned, like liftOver -minMatch. zero length intervals map to the point
+        before their position.
+        returns (query chrom index, query start, query end, strand) arrays, -1 chrom index
+        for intervals that can not be mapped
+        '''
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        empty = ends <= starts
+        schr, spos, sstrand = self.map_positions(chrom, starts)
+        echr, epos, estrand = self.map_positions(chrom, np.where(empty, starts, ends - 1))
+        ok = (schr >= 0) & (schr == echr) & (sstrand == estrand)
+        ok &= np.where(sstrand > 0, epos >= spos, epos <= spos)
+        aligned = self.aligned_bases(chrom, starts, ends)
+        ok &= empty | (aligned >= min_match * (ends - starts))
+        qstart = np.minimum(spos, epos)
+        qend = np.maximum(spos, epos) + 1
+        # the point before a base is after it on the query forward strand when the strand is -
+        point = np.where(sstrand > 0, spos, spos + 1)
+        qstart = np.where(empty, point, qstart)
+        qend = np.where(empty, point, qend)
+        return np.where(ok, schr, -1), np.where(ok, qstart, -1), np.where(ok, qend, -1), np.where(ok, sstrand, 0)
+
+
+def liftover_bed(index, bedfile, outfile, unmappedfile=None, min_match=MIN_MATCH):
+    '''maps the first three columns of a bed file, the strand column is flipped for - blocks, other columns are copied'''
+    rows = {}
+    with open_input(bedfile) as fin:
+        for line in fin:
+            if line.startswith(('#', 'track', 'browser')) or not line.strip():
+                continue
+            lst = line.rstrip('\n').split('\t')
+            rows.setdefault(lst[0], []).append(lst)
+    unmapped = open_output(unmappedfile) if unmappedfile else None
+    with open_output(outfile) as fout:
+        for chrom, lst in rows.items():
+            starts = np.array([int(x[1]) for x in lst], dtype=np.int64)
+            ends = np.array([int(x[2]) for x in lst], dtype=np.int64)
+            qchr, qstart, qend, strand = index.map_intervals(chrom, starts, ends, min_match)
+            for i, x in enumerate(lst):
+                if qchr[i] < 0:
+                    if unmapped:
+                        unmapped.write('\t'.join(x) + '\n')
+                    continue
+                rest = x[3:]
+                if strand[i] < 0 and len(rest) > 2 and rest[2] in FLIP:
+                    rest = rest[:2] + [FLIP[rest[2]]] + rest[3:]
+                fout.write('\t'.join([index.query_chroms[qchr[i]], str(qstart[i]), str(qend[i])] + rest) + '\n')
+    if unmapped:
+        unmapped.close()
+
+
+def main():
+    min_match = MIN_MATCH
+    if '--min-match' in sys.argv:
+        i = sys.argv.index('--min-match')
+        min_match = float(sys.argv[i + 1])
+        del sys.argv[i:i + 2]
+    if len(sys.argv) not in (4, 5, 6):
+        print('python3 axt_liftover.py [--min-match F] <chr size file> <axt file or .npz index> <input bed> <output bed> [unmapped bed]')
+        print('python3 axt_liftover.py <chr size file> <axt file> <output .npz index>')
+        sys.exit()
+    source = sys.argv[2]
+    if source.endswith('.npz'):
+        index = AlignmentIndex.load(source)
+    else:
+        index = AlignmentIndex.from_axt(source, read_chrsize(sys.argv[1]))
+    if len(sys.argv) == 4:
+        index.save(sys.argv[3])
+        return
+    liftover_bed(index, sys.argv[3], sys.argv[4], sys.argv[5] if len(sys.argv) == 6 else None, min_match)
+
+
+if __name__ == "__main__":
+    main()
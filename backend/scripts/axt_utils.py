@@ -0,0 +1,208 @@
+#!/usr/bin/python
+# usage: shared helpers for the axt scripts (axt2align.py, axtSplit.py, axt_liftover.py)
+
+# axt format: http://genome.ucsc.edu/goldenPath/help/axt.html
+
+import re
+import copy
+import numpy as np
+
+GAP = ord('-')
+
+
+def read_chrsize(f):
+    '''chromosome size file -> {chrom: size}'''
+    chrsize = {}
+    with open(f) as fin:
+        for line in fin:
+            lst = line.rstrip().split('\t')
+            chrsize[lst[0]] = int(lst[1])
+    return chrsize
+
+
+def read_axt(fin):
+    '''
+    yields one dict per alignment block, same keys as axtSplit.py uses:
+    item, ref_chr, ref_start, ref_end, query_chr, query_start, query_end, strand, seqs
+    coordinates are kept as in the axt file, 1-based and inclusive, query on the
+    reverse complemented chromosome when strand is -
+    '''
+    align = None
+    for line in fin:
+        if line[0] == '#':
+            continue
+        lst = line.rstrip().split()
+        if len(lst) >= 8:
+            align = {'item': lst[0], 'ref_chr': lst[1], 'ref_start': int(lst[2]), 'ref_end': int(lst[3]),
+                     'query_chr': lst[4], 'query_start': int(lst[5]), 'query_end': int(lst[6]), 'strand': lst[7],
+                     'seqs': []}
+        elif len(lst) == 1 and align is not None:
+            align['seqs'].append(lst[0])
+            if len(align['seqs']) == 2:
+                yield align
+                align = None
+
+
+def query_range(align, chrsize):
+    '''0-based half open query coordinates on the forward strand of the query chromosome'''
+    if align['strand'] == '+':
+        return align['query_start'] - 1, align['query_end']
+    c = chrsize[align['query_chr']]
+    return c - align['query_end'], c - align['query_start'] + 1
+
+
+def ungapped_segments(align):
+    '''
+    splits a gapped block into the runs of columns where both sequences have a base
+    returns (target starts, query starts, lengths) as arrays, starts are 0-based, the
+    query start is on the same strand as the axt query coordinates
+    '''
+    t = np.frombuffer(align['seqs'][0].encode(), dtype=np.uint8)
+    q = np.frombuffer(align['seqs'][1].encode(), dtype=np.uint8)
+    t_base = t != GAP
+    q_base = q != GAP
+    # number of bases consumed on each sequence before every column
+    t_offset = np.cumsum(t_base) - t_base
+    q_offset = np.cumsum(q_base) - q_base
+    run_starts, run_ends = _runs(t_base & q_base)
+    return (align['ref_start'] - 1 + t_offset[run_starts],
+            align['query_start'] - 1 + q_offset[run_starts],
+            run_ends - run_starts)
+
+
+def _runs(mask):
+    '''(start, end) column indices of the runs of True in a boolean array'''
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2], edges[1::2]
+
+
+def block_stats(targetseq, queryseq):
+    '''
+    identity and difference summary of one block, compared column by column, case insensitive
+    identity is the percent of matching columns among the columns with a base on both sides,
+    targetGap/queryGap count the gap runs (indels) in each sequence, mismatchPos is the
+    run length encoded mismatch columns as start:length pairs, 0-based in alignment columns
+    '''
+    t = np.frombuffer(targetseq.upper().encode(), dtype=np.uint8)
+    q = np.frombuffer(queryseq.upper().encode(), dtype=np.uint8)
+    t_gap = t == GAP
+    q_gap = q == GAP
+    aligned = ~t_gap & ~q_gap
+    mismatch = aligned & (t != q)
+    n_aligned = int(aligned.sum())
+    n_mismatch = int(mismatch.sum())
+    starts, ends = _runs(mismatch)
+    return {
+        'aligned': n_aligned,
+        'identity': round(100.0 * (n_aligned - n_mismatch) / n_aligned, 2) if n_aligned else 0,
+        'mismatch': n_mismatch,
+        'targetGap': len(_runs(t_gap)[0]),
+        'queryGap': len(_runs(q_gap)[0]),
+        'mismatchPos': ','.join('{}:{}'.format(s, e - s) for s, e in zip(starts.tolist(), ends.tolist())),
+    }
+
+
+# splitting blocks at long gaps, used by axtSplit.py and axt2align.py --split-gap
+
+def sub_align(align, relative_start, relative_end):
+    ref_seq = align['seqs'][0]
+    query_seq = align['seqs'][1]
+    sub_align = {}
+    sub_align['seqs'] = []
+    sub_align['ref_chr'] = align['ref_chr']
+    sub_align['query_chr'] = align['query_chr']
+    sub_align['strand'] = align['strand']
+
+    sub_align['seqs'].append(ref_seq[relative_start:relative_end])
+    prev_ref_seq = ref_seq[0:relative_start]
+    prev_ref_gaps = len(re.findall("-", prev_ref_seq))
+    sub_align['ref_start'] = align['ref_start'] + relative_start - prev_ref_gaps
+    sub_align['ref_end'] = sub_align['ref_start'] + len(re.findall(r'[^-]', sub_align['seqs'][0])) - 1
+
+    sub_align['seqs'].append(query_seq[relative_start:relative_end])
+    prev_query_seq = query_seq[0:relative_start]
+    prev_query_gaps = len(re.findall("-", prev_query_seq))
+    if align['strand'] == "+":
+        sub_align['query_start'] = align['query_start'] + relative_start - prev_query_gaps
+        sub_align['query_end'] = sub_align['query_start'] + len(re.findall(r'[^-]', sub_align['seqs'][1])) - 1
+    else:
+        sub_align['query_end'] = align['query_end'] - relative_start + prev_query_gaps
+        sub_align['query_start'] = sub_align['query_end'] - len(re.findall(r'[^-]', sub_align['seqs'][1])) + 1
+    return sub_align
+
+
+def split(align, gap_size):
+    gaps = []
+    for gap in re.finditer(rf'-{{{gap_size},}}', align['seqs'][0]):
+        gaps.append(gap.span())
+    for gap in re.finditer(rf'-{{{gap_size},}}', align['seqs'][1]):
+        gaps.append(gap.span())
+    gaps.sort(key=lambda x: x[0])
+    relative_start = 0
+    aligns = []
+    Right_align = copy.deepcopy(align)
+    for gap in gaps:
+        Left_align = sub_align(align, relative_start, gap[0])
+        Right_align = sub_align(align, gap[1], None)
+        relative_start = gap[1]
+        aligns.append(Left_align)
+    aligns.append(Right_align)
+    return aligns
+
+
+# synteny chaining, used by axt2align.py --synteny
+
+class SegmentChainer:
+    '''
+    merges collinear segments as they come in target order, each a list of
+    [chr, start, end, query chr, query start, query end, strand, block count, aligned, matches]
+    with 0-based half open coordinates, query on the forward strand. a segment extends the previous
+    one of the same chromosome pair and strand when it follows it on the target and on the query
+    (precedes it on the query for strand -) with gaps of at most max_gap on both, a short alignment
+    to somewhere else in between does not break the chain. add() returns the segments that can no
+    longer grow, all of them when the target chromosome changes, flush() the ones still open
+    '''
+
+    def __init__(self, max_gap):
+        self.max_gap = max_gap
+        self.chrom = None
+        self.current = {}
+
+    def add(self, seg):
+        closed = []
+        if seg[0] != self.chrom:
+            closed = self.flush()
+            self.chrom = seg[0]
+        key = (seg[3], seg[6])
+        last = self.current.get(key)
+        if last is not None:
+            target_gap = seg[1] - last[2]
+            query_gap = seg[4] - last[5] if seg[6] == '+' else last[4] - seg[5]
+            if 0 <= target_gap <= self.max_gap and 0 <= query_gap <= self.max_gap:
+                last[2] = seg[2]
+                last[4] = min(last[4], seg[4])
+                last[5] = max(last[5], seg[5])
+                last[7] += seg[7]
+                last[8] += seg[8]
+                last[9] += seg[9]
+                return closed
+            closed.append(last)
+        self.current[key] = list(seg)
+        return closed
+
+    def flush(self):
+        closed = list(self.current.values())
+        self.current = {}
+        return closed
+
+
+def chain_segments(segments, max_gap):
+    '''chains a whole list of segments (see SegmentChainer), returns new lists sorted by target position'''
+    chainer = SegmentChainer(max_gap)
+    chained = []
+    for seg in sorted(segments, key=lambda x: (x[0], x[1])):
+        chained.extend(chainer.add(seg))
+    chained.extend(chainer.flush())
+    chained.sort(key=lambda x: (x[0], x[1]))
+    return chained
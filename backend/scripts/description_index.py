@@ -0,0 +1,92 @@
+#!/usr/bin/python
+# usage: python3 description_index.py <refbed> <output> [max fraction of genes per token, default 0.05]
+
+# builds an inverted index over the description column (last column) of a converter output,
+# so keyword searches like "kinase" are an indexed lookup instead of a regex scan.
+# output is token, number of genes and the comma joined gene ids, one token per line:
+#   mongoimport -d <genome> -c <collection>Desc --drop --type tsv -f token,count,ids --file <output>
+#   db.<collection>Desc.createIndex({token: 1})
+# tokens found in more than the given fraction of genes ("protein", "putative") are pruned,
+# search terms have to go through normalize() to match the stored tokens.
+# input and output can be '-' for stdin/stdout and compressed, see stream_io.py
+
+import sys
+import re
+import json
+from urllib.parse import unquote_plus
+from stream_io import open_input, open_output
+
+STOPWORDS = {
+    'a', 'an', 'and', 'as', 'at', 'by', 'for', 'from', 'in', 'into', 'is', 'of', 'on', 'or', 'the', 'to', 'with',
+}
+TOKEN = re.compile(r'[a-z0-9]+(?:-[a-z0-9]+)*')
+ATTRIBUTE = re.compile(r'[A-Za-z_][\w.-]*=')
+
+
+def normalize(token):
+    '''lower case and a light plural strip of every hyphen part, kinases -> kinase'''
+    parts = token.lower().split('-')
+    for i, part in enumerate(parts):
+        if len(part) > 4 and part.endswith('s') and not part.endswith(('ss', 'us', 'is')):
+            parts[i] = part[:-1]
+    return '-'.join(parts)
+
+
+def description_text(desc):
+    '''the plain description, from mane json details or a raw gff attribute column'''
+    if desc.startswith('{'):
+        try:
+            return json.loads(desc).get('description', '')
+        except ValueError:
+            return desc
+    items = [item for item in desc.split(';') if item]
+    # plain descriptions can hold '=' and ';' too, "novel putative transporter 1;with=GeneDB:PBANKA_020830"
+    if desc.startswith('ID=') or (items and all(ATTRIBUTE.match(item) for item in items)):
+        for item in items:
+            if item.startswith('description='):
+                return unquote_plus(item[len('description='):])
+        return ''
+    return desc
+
+
+def tokenize(desc):
+    '''normalized tokens, hyphenated words give the compound and each part, atp-binding -> atp-binding, atp, binding'''
+    tokens = set()
+    for word in TOKEN.findall(description_text(desc).lower()):
+        for token in [word] + (word.split('-') if '-' in word else []):
+            if len(token) < 2 or token in STOPWORDS or token.isdigit():
+                continue
+            tokens.add(normalize(token))
+    return tokens
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        print('python3 description_index.py <refbed> <output> [max fraction of genes per token, default 0.05]')
+        sys.exit()
+    max_fraction = float(sys.argv[3]) if len(sys.argv) == 4 else 0.05
+    index = {}
+    genes = set()
+    with open_input(sys.argv[1]) as fin:
+        for line in fin:
+            t = line.rstrip('\n').split('\t')
+            if len(t) < 12:
+                continue
+            geneid = t[7]
+            genes.add(geneid)
+            for token in tokenize(t[11]):
+                index.setdefault(token, set()).add(geneid)
+    limit = max(1, int(len(genes) * max_fraction))
+    kept = 0
+    with open_output(sys.argv[2]) as fout:
+        for token in sorted(index):
+            ids = index[token]
+            if len(ids) > limit:
+                continue
+            kept += 1
+            fout.write('{}\t{}\t{}\n'.format(token, len(ids), ','.join(sorted(ids))))
+    print('genes: {}, tokens: {}, pruned: {}'.format(len(genes), kept, len(index) - kept), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/python
+# usage: python3 exon_codec.py <encode|decode> <input refbed> <output refbed>, '-' for stdin/stdout
+
+# compact exon payload for gene documents. instead of exonStarts and exonEnds as comma joined
+# absolute coordinates, each exon is stored as the distance from the end of the previous exon
+# (from txStart for the first one) and its length, packed as varints and base64 encoded so it
+# is still a plain TSV column. the distance is zigzag encoded, duplicated or overlapping exons
+# give negative distances. the value starts with PREFIX so mongoimport, which types TSV values,
+# can never take it for a number (a base64 string can be all digits).
+# encode turns the exonStarts and exonEnds columns of a converter output into one exons column:
+#   chrom,txStart,txEnd,cdsStart,cdsEnd,strand,name,id,transcriptionClass,exons,description
+# decode turns it back. to load a packed file, list it in setup/genomeConfig.js with
+# fieldsConfig: packedGeneFieldsAndIndex, then run setup as usual.
+# the browser decodes the column in frontend/src/model/exonCodec.ts, decode_exons() here is the
+# reference for it.
+#   convert | python3 exon_codec.py encode - - | load
+
+import sys
+import base64
+from stream_io import open_input, open_output
+from exon_utils import parse_exon_list
+
+PREFIX = '~'
+
+
+def _write_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data, i):
+    n = 0
+    shift = 0
+    while True:
+        byte = data[i]
+        i += 1
+        n |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return n, i
+        shift += 7
+
+
+def encode_exons(txstart, starts, ends):
+    '''exon starts and ends (ints) -> packed string'''
+    out = bytearray()
+    prev = txstart
+    for start, end in zip(starts, ends):
+        gap = start - prev
+        _write_varint(out, gap << 1 if gap >= 0 else (-gap << 1) - 1)
+        _write_varint(out, end - start)
+        prev = end
+    return PREFIX + base64.b64encode(bytes(out)).decode('ascii')
+
+
+def decode_exons(txstart, packed):
+    '''packed string -> (exon starts, exon ends) as lists of ints'''
+    data = base64.b64decode(packed[len(PREFIX):] if packed.startswith(PREFIX) else packed)
+    starts = []
+    ends = []
+    prev = txstart
+    i = 0
+    while i < len(data):
+        zigzag, i = _read_varint(data, i)
+        length, i = _read_varint(data, i)
+        start = prev + (zigzag >> 1 if zigzag % 2 == 0 else -((zigzag + 1) >> 1))
+        starts.append(start)
+        ends.append(start + length)
+        prev = start + length
+    return starts, ends
+
+
+def main():
+    if len(sys.argv) != 4 or sys.argv[1] not in ('encode', 'decode'):
+        print('python3 exon_codec.py <encode|decode> <input refbed> <output refbed>')
+        sys.exit()
+    with open_input(sys.argv[2]) as fin, open_output(sys.argv[3]) as fout:
+        for line in fin:
+            t = line.rstrip('\n').split('\t')
+            # rows without exon columns are passed through unchanged
+            if sys.argv[1] == 'encode' and len(t) >= 11:
+                t[9:11] = [encode_exons(int(t[1]), parse_exon_list(t[9]), parse_exon_list(t[10]))]
+            elif sys.argv[1] == 'decode' and len(t) >= 10:
+                starts, ends = decode_exons(int(t[1]), t[9])
+                t[9:10] = [','.join(str(x) for x in starts), ','.join(str(x) for x in ends)]
+            fout.write('\t'.join(t) + '\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/python
+# usage: python3 exon_utils.py <input refbed> <output refbed>, '-' for stdin/stdout
+
+# exon normalization shared by the gff converters. gff files list exon and CDS features of the
+# same transcript separately, appending both to the exon lists gives duplicated and overlapping
+# exons, so the exon intervals are sorted and merged and cdsStart/cdsEnd come from the CDS
+# features. run as a script it merges the exon columns of an existing converter output, the
+# cds columns are left alone since the CDS features are gone by then.
+
+import sys
+from stream_io import open_input, open_output
+
+
+def merge_exons(starts, ends):
+    '''sorted union of the exon intervals (0-based, half open), overlapping or touching exons are merged'''
+    merged = []
+    for start, end in sorted(zip(starts, ends)):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [x[0] for x in merged], [x[1] for x in merged]
+
+
+def cds_range(cds_starts, cds_ends, txend):
+    '''cdsStart and cdsEnd spanning the CDS features, txEnd for both when there are none, as UCSC does for non-coding'''
+    if not cds_starts:
+        return txend, txend
+    return min(cds_starts), max(cds_ends)
+
+
+def format_exons(starts, ends):
+    return ','.join(str(x) for x in starts), ','.join(str(x) for x in ends)
+
+
+def parse_exon_list(s):
+    s = s.strip().strip(',')
+    return [int(x) for x in s.split(',')] if s else []
+
+
+def main():
+    if len(sys.argv) != 3:
+        print('python3 exon_utils.py <input refbed> <output refbed>')
+        sys.exit()
+    with open_input(sys.argv[1]) as fin, open_output(sys.argv[2]) as fout:
+        for line in fin:
+            t = line.rstrip('\n').split('\t')
+            if len(t) >= 11:
+                t[9], t[10] = format_exons(*merge_exons(parse_exon_list(t[9]), parse_exon_list(t[10])))
+            fout.write('\t'.join(t) + '\n')
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,13 @@
+# usage: python3 format_GCF_012559485_gtf.py <gtf file> [output file, default genes.refbed], '-' for stdin/stdout
 import sys
+from stream_io import open_input, open_output
 
-gtffile = '/Users/d/Downloads/GCF_012559485.2_MFA1912RKSv2.ncbiRefSeq.gtf'
+if len(sys.argv) < 2:
+    print('python3 format_GCF_012559485_gtf.py <gtf file> [output file, default genes.refbed]')
+    sys.exit()
+
+gtffile = sys.argv[1]
+outfile = sys.argv[2] if len(sys.argv) > 2 else 'genes.refbed'
 
 # gff/gtf is 1-based
 
@@ -10,7 +17,7 @@ gene = {}
 # val: [chr, strand, txstart, txstop, cdsstart, cdsstop, [exon starts], [exon stops], desc=lst[8],symbol of gene id ]
 
 thismrna = ''
-with open(gtffile) as fin:
+with open_input(gtffile) as fin:
     for line in fin:
         if line.startswith('#'):
             continue
@@ -39,7 +46,7 @@ with open(gtffile) as fin:
 
 
 # write that into gene structure table similar as ucsc's
-fout = open('genes.refbed','w')
+fout = open_output(outfile)
 for g in gene:
     # name, chrom, strand, txstart, txend, cdsstart, cdsend, exoncount, exonstarts, exonstops, 0, name2
     fout.write('{0}\t{1}\t{2}\t{3}\t{4}\t{5}\t{6}\t{7}\t{8}\t{9}\t{10}\t{11}\n'.format(
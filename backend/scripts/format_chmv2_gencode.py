@@ -1,14 +1,21 @@
 # this script takes the file output by add_transcriptClass.py and formats it so mongoimport can read it
+# usage: python3 format_chmv2_gencode.py [catLiftOffGenesV1.bed] [catLiftOffGenesV1.refbed] [kgXref.txt], '-' for stdin/stdout
+import sys
 from format_gencode_gtf import typeMap
+from stream_io import open_input, open_output
+
+infile = sys.argv[1] if len(sys.argv) > 1 else 'catLiftOffGenesV1.bed'
+outfile = sys.argv[2] if len(sys.argv) > 2 else 'catLiftOffGenesV1.refbed'
+descfile = sys.argv[3] if len(sys.argv) > 3 else 'kgXref.txt'
 
 desc = {}
-with open('kgXref.txt') as fin:
+with open_input(descfile) as fin:
     # "kgID,mRNA,spID,spDisplayID,geneSymbol,refseq,protAcc,description,rfamAcc,tRnaName",
     for line in fin:
         t = line.strip().split('\t')
         desc[t[4]] = t[7]
 types = {}
-with open('catLiftOffGenesV1.bed')  as fin, open('catLiftOffGenesV1.refbed','w') as fout:
+with open_input(infile) as fin, open_output(outfile) as fout:
     for line in fin:
         t = line.strip().split('\t')
         chrom = t[0]
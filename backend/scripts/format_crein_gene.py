@@ -1,11 +1,13 @@
 import sys
+from stream_io import open_input, open_output
 
-if len(sys.argv) != 4:
-    print('Usage: {0} <Creinhardtii_281_v5.6.gene_exons.gff3> <Creinhardtii_281_v5.6.geneName.txt> <Creinhardtii_281_v5.6.description.txt>').format(
-        sys.argv[0])
+if len(sys.argv) not in (4, 5):
+    print('Usage: {0} <Creinhardtii_281_v5.6.gene_exons.gff3> <Creinhardtii_281_v5.6.geneName.txt> <Creinhardtii_281_v5.6.description.txt> [output file]'.format(
+        sys.argv[0]))
     sys.exit()
 
-gff3file, aliasfile, funcfile = sys.argv[1:]
+gff3file, aliasfile, funcfile = sys.argv[1:4]
+outfile = sys.argv[4] if len(sys.argv) == 5 else 'Creinhardtii5.6_load'
 
 # load up gene structure
 gene = {}
@@ -13,7 +15,7 @@ gene = {}
 # val: [chr, strand, txstart, txstop, cdsstart, cdsstop, [exon starts], [exon stops] ]
 
 thismrna = ''
-with open(gff3file) as fin:
+with open_input(gff3file) as fin:
     for line in fin:
         if line.startswith('#'):
             continue
@@ -41,7 +43,7 @@ with open(gff3file) as fin:
 
 # load desc
 desc = {}
-with open(funcfile) as fin:
+with open_input(funcfile) as fin:
     for line in fin:
         lst = line.rstrip().split('\t')
         if len(lst) > 1:
@@ -50,7 +52,7 @@ with open(funcfile) as fin:
 
 # load symbols
 symbols = {}
-with open(aliasfile) as fin:
+with open_input(aliasfile) as fin:
     for line in fin:
         lst = line.rstrip().split('\t')
         if len(lst) > 1:
@@ -59,7 +61,7 @@ with open(aliasfile) as fin:
 
 
 # write that into gene structure table similar as ucsc's
-fout = open('Creinhardtii5.6_load', 'w')
+fout = open_output(outfile)
 for g in gene:
     # name, chrom, strand, txstart, txend, cdsstart, cdsend, exoncount, exonstarts, exonstops, 0, name2
     if g in desc:
@@ -1,6 +1,12 @@
 # this script formats raw refgene data from UCSC so mongoimport can read it.
+# usage: python3 format_ensGene.py [ensGene.txt] [ensGene_load], '-' for stdin/stdout
+import sys
+from stream_io import open_input, open_output
 
-with open('ensGene.txt') as fin, open('ensGene_load', 'w') as fout:
+infile = sys.argv[1] if len(sys.argv) > 1 else 'ensGene.txt'
+outfile = sys.argv[2] if len(sys.argv) > 2 else 'ensGene_load'
+
+with open_input(infile) as fin, open_output(outfile) as fout:
     for line in fin:
         t = line.strip().split('\t')
         # the 2nd to last column is for gene type, or transcriptClass for gencode
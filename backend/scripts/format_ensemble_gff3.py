@@ -1,4 +1,6 @@
+# usage: python3 format_ensemble_gff3.py <gff3 file> <output file>, '-' for stdin/stdout
 import sys
+from stream_io import open_input, open_output
 
 gff3file= sys.argv[1]
 
@@ -10,7 +12,7 @@ gene = {}
 # val: [chr, strand, txstart, txstop, cdsstart, cdsstop, [exon starts], [exon stops], desc=lst[8],symbol of gene id ]
 
 thismrna = ''
-with open(gff3file) as fin:
+with open_input(gff3file) as fin:
     for line in fin:
         if line.startswith('#'):
             continue
@@ -39,7 +41,7 @@ with open(gff3file) as fin:
 
 
 # write that into gene structure table similar as ucsc's
-fout = open(sys.argv[2],'w')
+fout = open_output(sys.argv[2])
 for g in gene:
     # name, chrom, strand, txstart, txend, cdsstart, cdsend, exoncount, exonstarts, exonstops, 0, name2
     fout.write('{0}\t{1}\t{2}\t{3}\t{4}\t{5}\t{6}\t{7}\t{8}\t{9}\t{10}\t{11}\n'.format(
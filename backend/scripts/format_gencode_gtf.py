@@ -1,8 +1,10 @@
 #!/usr/bin/python
 # programmer : Daofeng
-# usage:
+# usage: python3 format_gencode_gtf.py [gtf file, default test.gtf] [output file, default stdout] [kgXref.txt]
+# '-' for stdin/stdout, gzip/zstd input is read directly
 
-import sys, gzip
+import sys
+from stream_io import open_input, open_output
 
 #from https://github.com/ucscGenomeBrowser/kent/blob/master/src/hg/lib/gtexGeneBed.c#L248
 
@@ -62,17 +64,17 @@ typeMap = {
 
 
 def main():
-    
+    gtffile = sys.argv[1] if len(sys.argv) > 1 else 'test.gtf'
+    outfile = sys.argv[2] if len(sys.argv) > 2 else '-'
+    descfile = sys.argv[3] if len(sys.argv) > 3 else 'kgXref.txt'
     desc = {}
-    with open('kgXref.txt') as fin:
+    with open_input(descfile) as fin:
         # "kgID,mRNA,spID,spDisplayID,geneSymbol,refseq,protAcc,description,rfamAcc,tRnaName",
         for line in fin:
             t = line.strip().split('\t')
             desc[t[4]] = t[7]
     d = {}
-    #with gzip.open('gencode.vM18.annotation.gtf.gz', 'rb') as fin:
-    # with open('gencode.vM18.annotation.gtf', 'rU') as fin:
-    with open('test.gtf', 'rU') as fin:
+    with open_input(gtffile) as fin:
         for line in fin:
             if line.startswith('#'): continue
             t = line.strip().split('\t')
@@ -108,12 +110,13 @@ def main():
                     d[geneid][9].append(start)
                 if end not in d[geneid][10]:
                     d[geneid][10].append(end)
-    for k in d:
-        v = d[k]
-        # print(v)
-        v[9] = '{}'.format(','.join(d[k][9]))
-        v[10] = '{}'.format(','.join(d[k][10]))
-        print('{}'.format('\t'.join(v)), file=sys.stdout)
+    with open_output(outfile) as fout:
+        for k in d:
+            v = d[k]
+            # print(v)
+            v[9] = '{}'.format(','.join(d[k][9]))
+            v[10] = '{}'.format(','.join(d[k][10]))
+            fout.write('{}\n'.format('\t'.join(v)))
 
 if __name__=="__main__":
     main()
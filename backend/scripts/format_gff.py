@@ -1,11 +1,13 @@
 #!/usr/bin/python
 # programmer : Daofeng
-# usage:
+# usage: python3 format_gff.py <gff file> [output file, default <gff file>.refbed, or stdout for stdin], '-' for stdin/stdout
 
 # convert regular gff to refbed for browser
 
 import sys
 from urllib.parse import unquote_plus
+from stream_io import open_input, open_output
+from exon_utils import merge_exons, cds_range, format_exons
 
 
 '''
@@ -20,10 +22,10 @@ Tb927_08_v5.1   VEuPathDB       five_prime_UTR  1390463 1390532 .       -
 def main():
     d = {}
     fin = sys.argv[1]
-    fout = '{}.refbed'.format(fin)
+    fout = sys.argv[2] if len(sys.argv) > 2 else '-' if fin == '-' else '{}.refbed'.format(fin)
     try:
-        with open(fin,"r") as infile:
-            with open(fout,'w') as outfile:
+        with open_input(fin) as infile:
+            with open_output(fout) as outfile:
                 for line in infile:
                     if line.startswith('#'): continue
                     if line.startswith('unitig'): continue
@@ -47,24 +49,26 @@ def main():
                             desc = unquote_plus(details['description'])
                         else:
                             desc = unquote_plus(t[8])
-                        d[dkey] = {'desc': desc, 'strand': t[6], 'chrom': t[0], 'start': int(t[3])-1, 'end':t[4], 'symbol': symbol, 'exonstarts': [], 'exonends': [], 'cdsstart': int(t[3])-1, 'cdsend':t[4]}
+                        d[dkey] = {'desc': desc, 'strand': t[6], 'chrom': t[0], 'start': int(t[3])-1, 'end': int(t[4]), 'symbol': symbol, 'exonstarts': [], 'exonends': [], 'cdsstarts': [], 'cdsends': []}
                     elif t[2].lower() == 'cds' or t[2].lower() == 'exon':
                         dkey = details['Parent']
                         if dkey not in d:
-                            print(dkey, 'error')
+                            print(dkey, 'error', file=sys.stderr)
                         else:
                             # print(dkey,'out')
-                            d[dkey]['exonstarts'].append(str(int(t[3])-1))
-                            d[dkey]['exonends'].append(t[4])
+                            kind = 'cds' if t[2].lower() == 'cds' else 'exon'
+                            d[dkey][kind + 'starts'].append(int(t[3])-1)
+                            d[dkey][kind + 'ends'].append(int(t[4]))
                 for k in d:
                     v = d[k]
-                    outfile.write('{}\t{}\t{}\t{}\t{}\t{}\t{}\t{}\t\t'.format(v['chrom'], v['start'], v['end'], v['cdsstart'], v['cdsend'], v['strand'], v['symbol'], k))
-                    es = sorted(v['exonstarts'], key=lambda x:int(x))
-                    ee = sorted(v['exonends'], key=lambda x:int(x))
-                    outfile.write('{}\t{}\t{}\n'.format(','.join(es), ','.join(ee), v['desc']))
+                    cdsstart, cdsend = cds_range(v['cdsstarts'], v['cdsends'], v['end'])
+                    # CDS features cover the coding part of exons, merging keeps exons without an exon feature
+                    es, ee = format_exons(*merge_exons(v['exonstarts'] + v['cdsstarts'], v['exonends'] + v['cdsends']))
+                    outfile.write('{}\t{}\t{}\t{}\t{}\t{}\t{}\t{}\t\t'.format(v['chrom'], v['start'], v['end'], cdsstart, cdsend, v['strand'], v['symbol'], k))
+                    outfile.write('{}\t{}\t{}\n'.format(es, ee, v['desc']))
                         
     except IOError as message:
-        print >> sys.stderr, "cannot open file",message
+        print("cannot open file", message, file=sys.stderr)
         sys.exit(1)
 
 if __name__=="__main__":
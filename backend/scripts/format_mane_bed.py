@@ -1,10 +1,17 @@
 # this script takes bed file from https://ftp.ncbi.nlm.nih.gov/refseq/MANE/MANE_human/ and formats it so mongoimport can read it
 # hg38 only sa far
+# usage: python3 format_mane_bed.py [mane.bed] [mane_select_v1.4.hg38.refbed] [kgXref.txt], '-' for stdin/stdout
+import sys
 import json
+from stream_io import open_input, open_output
+
+infile = sys.argv[1] if len(sys.argv) > 1 else 'mane.bed'
+outfile = sys.argv[2] if len(sys.argv) > 2 else 'mane_select_v1.4.hg38.refbed'
+descfile = sys.argv[3] if len(sys.argv) > 3 else 'kgXref.txt'
 
 
 desc = {}
-with open('kgXref.txt') as fin:
+with open_input(descfile) as fin:
     # "kgID,mRNA,spID,spDisplayID,geneSymbol,refseq,protAcc,description,rfamAcc,tRnaName",
     for line in fin:
         t = line.strip().split('\t')
@@ -12,7 +19,7 @@ with open('kgXref.txt') as fin:
 
 # with open('MANE.GRCh38.v1.0.refseq.bed')  as fin, open('mane_select_v1.0.hg38.refbed','w') as fout:
 # get mane.bb from ucsc
-with open('mane.bed')  as fin, open('mane_select_v1.4.hg38.refbed','w') as fout:
+with open_input(infile) as fin, open_output(outfile) as fout:
     for line in fin:
         t = line.strip().split('\t')
         chrom = t[0]
@@ -1,12 +1,19 @@
 # this script formats raw ncbi refseq data so mongoimport can read it.
+# usage: python3 format_ncbiRefseq.py [ncbiRefSeq.txt] [ncbiRefSeq_load] [ncbiRefSeqLink.txt], '-' for stdin/stdout
+import sys
+from stream_io import open_input, open_output
+
+infile = sys.argv[1] if len(sys.argv) > 1 else 'ncbiRefSeq.txt'
+outfile = sys.argv[2] if len(sys.argv) > 2 else 'ncbiRefSeq_load'
+descfile = sys.argv[3] if len(sys.argv) > 3 else 'ncbiRefSeqLink.txt'
 
 desc = {}
-with open('ncbiRefSeqLink.txt') as fin:
+with open_input(descfile) as fin:
     # "id,status,name,product,mrnaAcc,protAcc,locusLinkId,omimId,hgnc,genbank,pseudo,gbkey,source,gene_biotype,gene_synonym,ncrna_class,note,description,externalId",
     for line in fin:
         t = line.strip().split('\t')
         desc[t[0]] = t[3]
-with open('ncbiRefSeq.txt')  as fin, open('ncbiRefSeq_load','w') as fout:
+with open_input(infile) as fin, open_output(outfile) as fout:
     for line in fin:
         t = line.strip().split('\t')
         if t[1] in desc:
@@ -1,8 +1,13 @@
 # this script formats PlasmoDB v9.0 Coding genes so mongoimport can read it.
-import urllib
-import urllib3
+# usage: python3 format_pfal3d7_gene.py [extractedGeneCoordinates.txt] [PlasmoDB9Gene_load], '-' for stdin/stdout
+import sys
+import urllib.parse
+from stream_io import open_input, open_output
 
-with open('extractedGeneCoordinates.txt')  as fin, open('PlasmoDB9Gene_load','w') as fout:
+infile = sys.argv[1] if len(sys.argv) > 1 else 'extractedGeneCoordinates.txt'
+outfile = sys.argv[2] if len(sys.argv) > 2 else 'PlasmoDB9Gene_load'
+
+with open_input(infile) as fin, open_output(outfile) as fout:
     next(fin)
     for line in fin:
         t = line.strip().split('\t')
@@ -1,12 +1,19 @@
 # this script formats raw refgene data from UCSC so mongoimport can read it.
+# usage: python3 format_refGene_with_refLink.py [refGene.txt] [refGene_load] [refLink.txt], '-' for stdin/stdout
+import sys
+from stream_io import open_input, open_output
+
+infile = sys.argv[1] if len(sys.argv) > 1 else 'refGene.txt'
+outfile = sys.argv[2] if len(sys.argv) > 2 else 'refGene_load'
+descfile = sys.argv[3] if len(sys.argv) > 3 else 'refLink.txt'
 
 desc = {}
-with open('refLink.txt') as fin:
+with open_input(descfile) as fin:
     # `name`, `product` ,`mrnaAcc` ,`protAcc` ,`geneName` ,`prodName` ,`locusLinkId` ,`omimId` ,
     for line in fin:
         t = line.strip().split('\t')
         desc[t[2]] = t[1]
-with open('refGene.txt')  as fin, open('refGene_load','w') as fout:
+with open_input(infile) as fin, open_output(outfile) as fout:
     for line in fin:
         t = line.strip().split('\t')
         if t[1] in desc:
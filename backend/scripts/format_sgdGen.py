@@ -1,16 +1,24 @@
 # this script formats sgdGene data from UCSC for yeast so mongoimport can read it.
+# usage: python3 format_sgdGen.py [sgdGene.txt] [sgdGene_load] [sgdDescription.txt] [sgdToName.txt], '-' for stdin/stdout
+import sys
+from stream_io import open_input, open_output
+
+infile = sys.argv[1] if len(sys.argv) > 1 else 'sgdGene.txt'
+outfile = sys.argv[2] if len(sys.argv) > 2 else 'sgdGene_load'
+descfile = sys.argv[3] if len(sys.argv) > 3 else 'sgdDescription.txt'
+namefile = sys.argv[4] if len(sys.argv) > 4 else 'sgdToName.txt'
 
 descs = {}
 names = {}
-with open('sgdDescription.txt') as fin:
+with open_input(descfile) as fin:
     for line in fin:
         t = line.strip().split('\t')
         descs[t[0]] = t[2]
-with open('sgdToName.txt') as fin:
+with open_input(namefile) as fin:
     for line in fin:
         t = line.strip().split('\t')
         names[t[0]] = t[1]
-with open('sgdGene.txt') as fin, open('sgdGene_load', 'w') as fout:
+with open_input(infile) as fin, open_output(outfile) as fout:
     for line in fin:
         t = line.strip().split('\t')
         if t[1] in descs:
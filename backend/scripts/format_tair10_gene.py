@@ -1,10 +1,12 @@
 import sys
+from stream_io import open_input, open_output
 
-if len(sys.argv) != 4:
-    print 'Usage: {0} <TAIR10_GFF3_genes.gff> <gene_aliases.date.txt> <TAIR10_functional_descriptions>'.format(sys.argv[0])
+if len(sys.argv) not in (4, 5):
+    print('Usage: {0} <TAIR10_GFF3_genes.gff> <gene_aliases.date.txt> <TAIR10_functional_descriptions> [output file]'.format(sys.argv[0]))
     sys.exit()
 
-gff3file, aliasfile, funcfile = sys.argv[1:]
+gff3file, aliasfile, funcfile = sys.argv[1:4]
+outfile = sys.argv[4] if len(sys.argv) == 5 else 'tair10Gene_load'
 
 # load up gene structure
 gene = {}
@@ -12,7 +14,7 @@ gene = {}
 # val: [chr, strand, txstart, txstop, cdsstart, cdsstop, [exon starts], [exon stops] ]
 
 thismrna = ''
-with open(gff3file) as fin:
+with open_input(gff3file) as fin:
     for line in fin:
         lst = line.split('\t')
         if lst[2] == 'mRNA':
@@ -30,7 +32,7 @@ with open(gff3file) as fin:
 
 # load name - symbol - desc
 desc = {}
-with open(funcfile) as fin:
+with open_input(funcfile) as fin:
     for line in fin:
         lst = line.rstrip().split('\t')
         if len(lst) > 2:
@@ -38,7 +40,7 @@ with open(funcfile) as fin:
             desc[n] = [n,lst[2]]
 
 # fill in alias
-with open(aliasfile) as fin:
+with open_input(aliasfile) as fin:
     for line in fin:
         lst = line.rstrip().split('\t')
         if lst[0] in desc:
@@ -49,7 +51,7 @@ with open(aliasfile) as fin:
 
 
 # write that into gene structure table similar as ucsc's
-fout = open('tair10Gene_load','w')
+fout = open_output(outfile)
 for g in gene:
     # name, chrom, strand, txstart, txend, cdsstart, cdsend, exoncount, exonstarts, exonstops, 0, name2
     symbol = g.split('.')[0]
@@ -0,0 +1,302 @@
+#!/usr/bin/python
+# usage: python3 gene_server.py build <genomeData dir> <index dir> [genomeConfig.js]
+#        python3 gene_server.py serve <index dir> [port, default 3001] [host, default localhost]
+
+# read-only gene API without MongoDB, for static annotation data and laptops. it answers the
+# same routes as the node backend (routes/geneLocusSearch.js and routes/geneNameSearch.js):
+#   /{genome}/genes/{collection}/queryRegion?chr=&start=&end=
+#   /{genome}/genes/queryName?q=&isExact=&getOnlyNames=
+# build reads the collections listed in setup/genomeConfig.js (loaded with node, which the
+# backend needs anyway) from the refbed files and writes, per genome and collection, the
+# records as json sorted by chrom/txStart, an implicit interval tree per chromosome (the
+# augmented sorted array of cgranges, https://github.com/lh3/cgranges) and a sorted array of
+# lower case names. serve memory-maps those files, so requests are answered from the page cache
+# and start-up does not read the data.
+
+import os
+import re
+import sys
+import json
+import mmap
+import subprocess
+import numpy as np
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from stream_io import open_input
+
+GENOME_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'setup', 'genomeConfig.js')
+RECORDS_LIMIT = 50  # same as routes/geneNameSearch.js
+LINEAR_SCAN_LEVEL = 3  # subtrees this small are scanned instead of walked
+INTEGER = re.compile(r'^-?\d+$')
+FLOAT = re.compile(r'^-?(\d+\.\d*|\.\d+|\d+)([eE][-+]?\d+)?$')
+
+
+def read_genome_config(f=GENOME_CONFIG):
+    '''{genome: [(collection name, file, field names)]} from setup/genomeConfig.js, evaluated by node'''
+    js = subprocess.run(['node', '-e', 'console.log(JSON.stringify(require(process.argv[1])))', os.path.abspath(f)],
+                        stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout
+    config = {}
+    for genome, collections in json.loads(js).items():
+        config[genome] = [(c['name'], c['file'], c['fieldsConfig']['fields'].split(',')) for c in collections]
+    return config
+
+
+def imported_value(value):
+    '''types a TSV value the way mongoimport does'''
+    if INTEGER.match(value):
+        return int(value)
+    if FLOAT.match(value):
+        return float(value)
+    return value
+
+
+def build_tree(starts, ends):
+    '''max end of each implicit subtree over intervals sorted by start, and the tree height'''
+    n = len(starts)
+    maxends = ends.copy()
+    if n == 0:
+        return maxends, -1
+    last_i = (n - 1) & ~1
+    last = int(maxends[last_i])
+    k = 1
+    while 1 << k <= n:
+        x = 1 << (k - 1)
+        i = np.arange((x << 1) - 1, n, x << 2)
+        right = np.where(i + x < n, maxends[np.minimum(i + x, n - 1)], last)
+        maxends[i] = np.maximum(np.maximum(ends[i], maxends[i - x]), right)
+        last_i = last_i - x if last_i >> k & 1 else last_i + x
+        if last_i < n and maxends[last_i] > last:
+            last = int(maxends[last_i])
+        k += 1
+    return maxends, k - 1
+
+
+def build_collection(refbed, fields, outdir):
+    docs = []
+    with open_input(refbed) as fin:
+        for line in fin:
+            line = line.rstrip('\n')
+            if not line:
+                continue
+            doc = {k: imported_value(v) for k, v in zip(fields, line.split('\t'))}
+            docs.append(doc)
+    docs.sort(key=lambda d: (str(d['chrom']), d['txStart']))
+    os.makedirs(outdir, exist_ok=True)
+    offsets = np.zeros(len(docs) + 1, dtype=np.int64)
+    with open(os.path.join(outdir, 'records.bin'), 'wb') as fout:
+        for i, doc in enumerate(docs):
+            data = json.dumps(doc, separators=(',', ':')).encode()
+            fout.write(data)
+            offsets[i + 1] = offsets[i] + len(data)
+    starts = np.array([d['txStart'] for d in docs], dtype=np.int64)
+    ends = np.array([d['txEnd'] for d in docs], dtype=np.int64)
+    maxends = np.empty_like(ends)
+    chroms = {}
+    i = 0
+    while i < len(docs):
+        chrom = str(docs[i]['chrom'])
+        j = i
+        while j < len(docs) and str(docs[j]['chrom']) == chrom:
+            j += 1
+        maxends[i:j], level = build_tree(starts[i:j], ends[i:j])
+        chroms[chrom] = [i, j - i, level]
+        i = j
+    names = [str(d.get('name', '')).lower().encode() for d in docs]
+    order = sorted(range(len(docs)), key=lambda k: names[k])
+    np.save(os.path.join(outdir, 'offsets.npy'), offsets)
+    np.save(os.path.join(outdir, 'starts.npy'), starts)
+    np.save(os.path.join(outdir, 'ends.npy'), ends)
+    np.save(os.path.join(outdir, 'maxends.npy'), maxends)
+    np.save(os.path.join(outdir, 'names.npy'), np.array([names[k] for k in order], dtype=bytes))
+    np.save(os.path.join(outdir, 'name_records.npy'), np.array(order, dtype=np.int64))
+    with open(os.path.join(outdir, 'meta.json'), 'w') as fout:
+        json.dump({'chroms': chroms}, fout)
+    return len(docs)
+
+
+def build(datadir, indexdir, configfile=GENOME_CONFIG):
+    config = read_genome_config(configfile)
+    for genome, collections in config.items():
+        built = []
+        for name, file, fields in collections:
+            refbed = os.path.join(datadir, genome, file)
+            if not os.path.exists(refbed):
+                continue
+            n = build_collection(refbed, fields, os.path.join(indexdir, genome, name))
+            built.append(name)
+            print('{}/{}: {} records'.format(genome, name, n), file=sys.stderr)
+        if built:
+            # queryName searches the collections in genomeConfig.js order
+            with open(os.path.join(indexdir, genome, 'collections.json'), 'w') as fout:
+                json.dump(built, fout)
+
+
+class CollectionIndex:
+    '''memory-mapped index of one gene collection'''
+
+    def __init__(self, d):
+        with open(os.path.join(d, 'meta.json')) as fin:
+            self.chroms = json.load(fin)['chroms']
+        self.offsets = np.load(os.path.join(d, 'offsets.npy'), mmap_mode='r')
+        # empty files can not be memory-mapped
+        mode = 'r' if len(self.offsets) > 1 else None
+        load = lambda f: np.load(os.path.join(d, f), mmap_mode=mode)
+        self.starts = load('starts.npy')
+        self.ends = load('ends.npy')
+        self.maxends = load('maxends.npy')
+        self.names = load('names.npy')
+        self.name_records = load('name_records.npy')
+        with open(os.path.join(d, 'records.bin'), 'rb') as fin:
+            self.records = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) if mode else b''
+
+    def record(self, i):
+        '''json bytes of record i'''
+        return self.records[self.offsets[i]:self.offsets[i + 1]]
+
+    def query_region(self, chrom, start, end):
+        '''
+        indices of the records overlapping [start, end) on chrom, and how many intervals were
+        examined, same test as the mongo query txStart < end and txEnd > start
+        '''
+        if chrom not in self.chroms:
+            return [], 0
+        off, n, max_level = self.chroms[chrom]
+        starts = self.starts[off:off + n]
+        ends = self.ends[off:off + n]
+        maxends = self.maxends[off:off + n]
+        hits = []
+        examined = 0
+        stack = [((1 << max_level) - 1, max_level, False)]
+        while stack:
+            x, k, left_done = stack.pop()
+            if k <= LINEAR_SCAN_LEVEL:
+                i0 = x >> k << k
+                i1 = min(i0 + (1 << (k + 1)) - 1, n)
+                i1 = i0 + int(np.searchsorted(starts[i0:i1], end, side='left'))
+                examined += i1 - i0
+                hits.extend((i0 + np.flatnonzero(ends[i0:i1] > start)).tolist())
+            elif not left_done:
+                y = x - (1 << (k - 1))
+                stack.append((x, k, True))
+                if y >= n or maxends[y] > start:
+                    stack.append((y, k - 1, False))
+            elif x < n and starts[x] < end:
+                examined += 1
+                if start < ends[x]:
+                    hits.append(x)
+                stack.append((x + (1 << (k - 1)), k - 1, False))
+        return [off + i for i in sorted(hits)], examined
+
+    def query_name(self, q, is_exact, limit=RECORDS_LIMIT):
+        '''indices of the records whose name starts with (or is) q, case insensitive'''
+        key = q.lower().encode()
+        lo = int(np.searchsorted(self.names, key, side='left'))
+        if is_exact:
+            hi = int(np.searchsorted(self.names, key, side='right'))
+        else:
+            hi = int(np.searchsorted(self.names, key + b'\xff', side='left'))
+        return self.name_records[lo:min(hi, lo + limit)].tolist(), hi - lo
+
+
+class GeneIndex:
+    '''all collections found under an index directory made by build'''
+
+    def __init__(self, indexdir):
+        self.genomes = {}
+        for genome in sorted(os.listdir(indexdir)):
+            listing = os.path.join(indexdir, genome, 'collections.json')
+            if not os.path.exists(listing):
+                continue
+            with open(listing) as fin:
+                names = json.load(fin)
+            self.genomes[genome] = {name: CollectionIndex(os.path.join(indexdir, genome, name)) for name in names}
+
+    def query_region(self, genome, collection, chrom, start, end):
+        '''json bytes of the response, and the number of intervals examined'''
+        index = self.genomes.get(genome, {}).get(collection)
+        if index is None:
+            return b'[]', 0
+        hits, examined = index.query_region(chrom, start, end)
+        return b'[' + b','.join(index.record(i) for i in hits) + b']', examined
+
+    def query_name(self, genome, q, is_exact, get_only_names):
+        '''json bytes of the response, None for an unknown genome, and the number of names examined'''
+        if genome not in self.genomes:
+            return None, 0
+        records = []
+        examined = 0
+        for name, index in self.genomes[genome].items():
+            hits, n = index.query_name(q, is_exact)
+            examined += n
+            # inject the collection name into the records, like the node route does
+            tail = ',"collection":{}}}'.format(json.dumps(name)).encode()
+            records.extend(index.record(i)[:-1] + tail for i in hits)
+        if get_only_names:
+            names = []
+            for record in records:
+                name = json.loads(record).get('name')
+                if name not in names:
+                    names.append(name)
+            return json.dumps(names).encode(), examined
+        return b'[' + b','.join(records) + b']', examined
+
+
+def parse_bool(value):
+    return value.lower() in ('true', '1', 'yes', 'on')
+
+
+class GeneRequestHandler(BaseHTTPRequestHandler):
+    index = None
+
+    def send_json(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, error, message):
+        self.send_json(status, json.dumps({'statusCode': status, 'error': error, 'message': message}).encode())
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip('/').split('/')
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        try:
+            if len(parts) == 4 and parts[1] == 'genes' and parts[3] == 'queryRegion':
+                body, _ = self.index.query_region(parts[0], parts[2], query['chr'],
+                                                  int(query['start']), int(query['end']))
+                return self.send_json(200, body)
+            if len(parts) == 3 and parts[1] == 'genes' and parts[2] == 'queryName':
+                body, _ = self.index.query_name(parts[0], query['q'], parse_bool(query.get('isExact', 'false')),
+                                                parse_bool(query.get('getOnlyNames', 'false')))
+                if body is None:
+                    return self.send_error_json(404, 'Not Found', 'Genome "{}" not found.'.format(parts[0]))
+                return self.send_json(200, body)
+        except (KeyError, ValueError) as error:
+            return self.send_error_json(400, 'Bad Request', 'Invalid request query input: {}'.format(error))
+        self.send_error_json(404, 'Not Found', 'Not Found')
+
+
+def serve(indexdir, port=3001, host='localhost'):
+    GeneRequestHandler.index = GeneIndex(indexdir)
+    server = ThreadingHTTPServer((host, port), GeneRequestHandler)
+    print('Server running at http://{}:{}'.format(host, port), file=sys.stderr)
+    server.serve_forever()
+
+
+def main():
+    if len(sys.argv) in (4, 5) and sys.argv[1] == 'build':
+        build(sys.argv[2], sys.argv[3], sys.argv[4] if len(sys.argv) == 5 else GENOME_CONFIG)
+    elif len(sys.argv) in (3, 4, 5) and sys.argv[1] == 'serve':
+        serve(sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else 3001,
+              sys.argv[4] if len(sys.argv) > 4 else 'localhost')
+    else:
+        print('python3 gene_server.py build <genomeData dir> <index dir> [genomeConfig.js]')
+        print('python3 gene_server.py serve <index dir> [port, default 3001] [host, default localhost]')
+        sys.exit()
+
+
+if __name__ == "__main__":
+    main()
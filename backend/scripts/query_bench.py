@@ -0,0 +1,258 @@
+#!/usr/bin/python
+# usage: python3 query_bench.py --help
+
+# load generator for the gene locus and name search paths, to see how the indexes in
+# setup/genomeConfig.js or a change of data layout behave under concurrent requests.
+# a workload is generated from the refbed files under genomeData, or replayed from a file with
+# one request per line, either json as written by --save or a request path as found in access
+# logs, e.g. /hg19/genes/refGene/queryRegion?chr=chr7&start=27210209&end=27219880
+#   region queries: around random genes, widths drawn log-uniformly per zoom level
+#   name queries: the keystroke prefixes of random gene names (getOnlyNames, like the search
+#   box autocomplete), then the exact name
+# backends:
+#   mongo    a local mongod, same queries as the node routes (needs pymongo), documents and
+#            keys examined are taken from explain() on a sample of the queries
+#   refbed   the memory-mapped index of gene_server.py, in process
+#   http     any server with the same routes, node backend or gene_server.py serve
+# p50/p95/p99 latency, throughput and examined documents are reported per genome and collection.
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs, urlencode, quote
+from urllib.request import urlopen
+from gene_server import read_genome_config, GeneIndex, RECORDS_LIMIT
+from stream_io import open_input, open_output
+
+# (share of region queries, min width, max width)
+ZOOM_LEVELS = [
+    (0.5, 1000, 100000),  # gene level
+    (0.35, 100000, 5000000),  # locus level
+    (0.15, 5000000, 50000000),  # chromosome level
+]
+EXPLAIN_SAMPLE = 200
+
+
+def load_genes(datadir, genomes, config):
+    '''{genome: {collection: [(chrom, txStart, txEnd, name)]}} from the refbed files'''
+    genes = {}
+    for genome in genomes:
+        for name, file, fields in config.get(genome, []):
+            refbed = os.path.join(datadir, genome, file)
+            if not os.path.exists(refbed):
+                continue
+            rows = []
+            with open_input(refbed) as fin:
+                for line in fin:
+                    t = dict(zip(fields, line.rstrip('\n').split('\t')))
+                    if 'chrom' in t and 'txEnd' in t:
+                        rows.append((t['chrom'], int(t['txStart']), int(t['txEnd']), t.get('name', '')))
+            if rows:
+                genes.setdefault(genome, {})[name] = rows
+    return genes
+
+
+def generate(genes, n, name_fraction, seed):
+    rng = random.Random(seed)
+    targets = [(genome, collection) for genome in genes for collection in genes[genome]]
+    queries = []
+    while len(queries) < n:
+        genome, collection = rng.choice(targets)
+        chrom, start, end, name = rng.choice(genes[genome][collection])
+        if rng.random() < name_fraction and name:
+            for i in range(1, len(name) + 1):
+                queries.append({'type': 'name', 'genome': genome, 'q': name[:i], 'isExact': False, 'getOnlyNames': True})
+            queries.append({'type': 'name', 'genome': genome, 'q': name, 'isExact': True, 'getOnlyNames': False})
+        else:
+            weights = [level[0] for level in ZOOM_LEVELS]
+            _, low, high = rng.choices(ZOOM_LEVELS, weights)[0]
+            width = int(low * (high / low) ** rng.random())
+            center = (start + end) // 2
+            queries.append({'type': 'region', 'genome': genome, 'collection': collection, 'chr': chrom,
+                            'start': max(0, center - width // 2), 'end': center + width // 2})
+    return queries[:n]
+
+
+def parse_request(line):
+    '''one replay line, json or a request path'''
+    line = line.strip()
+    if line.startswith('{'):
+        return json.loads(line)
+    url = urlparse(line)
+    parts = url.path.strip('/').split('/')
+    query = {k: v[0] for k, v in parse_qs(url.query).items()}
+    if parts[-1] == 'queryRegion':
+        return {'type': 'region', 'genome': parts[0], 'collection': parts[2], 'chr': query['chr'],
+                'start': int(query['start']), 'end': int(query['end'])}
+    return {'type': 'name', 'genome': parts[0], 'q': query['q'],
+            'isExact': query.get('isExact', 'false') == 'true',
+            'getOnlyNames': query.get('getOnlyNames', 'false') == 'true'}
+
+
+def group_key(query):
+    return '{}/{}'.format(query['genome'], query['collection'] if query['type'] == 'region' else 'queryName')
+
+
+class RefbedBackend:
+
+    def __init__(self, indexdir):
+        self.index = GeneIndex(indexdir)
+
+    def run(self, query):
+        '''runs one query, returns the number of documents examined, None when unknown'''
+        if query['type'] == 'region':
+            _, examined = self.index.query_region(query['genome'], query['collection'], query['chr'],
+                                                  query['start'], query['end'])
+        else:
+            _, examined = self.index.query_name(query['genome'], query['q'], query['isExact'],
+                                                query['getOnlyNames'])
+        return examined
+
+
+class HttpBackend:
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+
+    def run(self, query):
+        if query['type'] == 'region':
+            path = '/{}/genes/{}/queryRegion?'.format(query['genome'], query['collection']) + urlencode(
+                {'chr': query['chr'], 'start': query['start'], 'end': query['end']})
+        else:
+            path = '/{}/genes/queryName?'.format(query['genome']) + urlencode(
+                {'q': query['q'], 'isExact': str(query['isExact']).lower(),
+                 'getOnlyNames': str(query['getOnlyNames']).lower()})
+        with urlopen(self.url + path) as response:
+            response.read()
+        return None
+
+
+class MongoBackend:
+
+    def __init__(self, url, config):
+        try:
+            from pymongo import MongoClient
+        except ImportError:
+            sys.exit('the mongo backend needs pymongo: pip install pymongo')
+        self.client = MongoClient(url)
+        self.config = config
+        self.explain = False
+
+    def _find(self, genome, collection, selector, limit=0):
+        cursor = self.client[genome][collection].find(selector, limit=limit)
+        if self.explain:
+            stats = cursor.explain()['executionStats']
+            return stats['totalDocsExamined'], stats['totalKeysExamined']
+        list(cursor)
+        return None
+
+    def run(self, query):
+        genome = query['genome']
+        if query['type'] == 'region':
+            # routes/geneLocusSearch.js
+            return self._find(genome, query['collection'], {'chrom': query['chr'], 'txStart': {'$lt': query['end']},
+                                                             'txEnd': {'$gt': query['start']}})
+        # routes/geneNameSearch.js, every collection of the genome, q goes through encodeURIComponent there
+        q = quote(query['q'], safe="-_.!~*'()")
+        selector = {'name': {'$regex': '^{}{}'.format(q, '$' if query['isExact'] else ''), '$options': 'i'}}
+        results = [self._find(genome, name, selector, RECORDS_LIMIT) for name, _, _ in self.config.get(genome, [])]
+        if self.explain:
+            return tuple(map(sum, zip(*results))) if results else (0, 0)
+        return None
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))]
+
+
+def run(backend, queries, concurrency):
+    latencies = defaultdict(list)
+    examined = defaultdict(list)
+
+    def one(query):
+        t = time.perf_counter()
+        n = backend.run(query)
+        return query, time.perf_counter() - t, n
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        for query, latency, n in executor.map(one, queries):
+            latencies[group_key(query)].append(latency)
+            if n is not None:
+                examined[group_key(query)].append(n)
+    return latencies, examined, time.perf_counter() - start
+
+
+def report(latencies, examined, wall, fout=sys.stdout):
+    total = sum(len(v) for v in latencies.values())
+    fout.write('{} queries in {:.2f}s, {:.1f} queries/s\n'.format(total, wall, total / wall))
+    fout.write('{:<40}{:>8}{:>10}{:>10}{:>10}{:>12}{:>14}\n'.format(
+        'genome/collection', 'queries', 'p50 ms', 'p95 ms', 'p99 ms', 'queries/s', 'examined'))
+    for key in sorted(latencies):
+        values = latencies[key]
+        n = examined.get(key)
+        if n and isinstance(n[0], tuple):
+            shown = '{:.0f}/{:.0f}'.format(sum(x[0] for x in n) / len(n), sum(x[1] for x in n) / len(n))
+        elif n:
+            shown = '{:.0f}'.format(sum(n) / len(n))
+        else:
+            shown = '-'
+        # throughput share of the run, the queries of all groups are interleaved
+        fout.write('{:<40}{:>8}{:>10.2f}{:>10.2f}{:>10.2f}{:>12.1f}{:>14}\n'.format(
+            key, len(values), percentile(values, 50) * 1000, percentile(values, 95) * 1000,
+            percentile(values, 99) * 1000, len(values) / wall, shown))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='gene locus and name search load generator')
+    parser.add_argument('backend', choices=['mongo', 'refbed', 'http'])
+    parser.add_argument('--target', help='mongo url (default mongodb://localhost:27017), '
+                        'gene_server.py index dir for refbed, or server url for http')
+    parser.add_argument('--data', default='genomeData', help='genomeData dir to generate the workload from')
+    parser.add_argument('--genomes', default='', help='comma separated genomes, default all with data')
+    parser.add_argument('--config', default=None, help='genomeConfig.js, default setup/genomeConfig.js')
+    parser.add_argument('--queries', type=int, default=10000)
+    parser.add_argument('--name-fraction', type=float, default=0.3, help='share of genes searched by name')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--replay', help='workload file to replay instead of generating one, - for stdin')
+    parser.add_argument('--save', help='write the workload to this file')
+    args = parser.parse_args()
+
+    config = read_genome_config(args.config) if args.config else read_genome_config()
+    if args.replay:
+        with open_input(args.replay) as fin:
+            queries = [parse_request(line) for line in fin if line.strip()]
+    else:
+        genomes = args.genomes.split(',') if args.genomes else sorted(config)
+        queries = generate(load_genes(args.data, genomes, config), args.queries, args.name_fraction, args.seed)
+    if args.save:
+        with open_output(args.save) as fout:
+            for query in queries:
+                fout.write(json.dumps(query) + '\n')
+
+    if args.backend == 'mongo':
+        backend = MongoBackend(args.target or 'mongodb://localhost:27017', config)
+    elif args.backend == 'refbed':
+        backend = RefbedBackend(args.target or 'geneIndex')
+    else:
+        backend = HttpBackend(args.target or 'http://localhost:3001')
+
+    latencies, examined, wall = run(backend, queries, args.concurrency)
+    if args.backend == 'mongo':
+        # explain runs the query again, so it is kept out of the timed run
+        backend.explain = True
+        sample = random.Random(args.seed).sample(queries, min(EXPLAIN_SAMPLE, len(queries)))
+        examined = run(backend, sample, args.concurrency)[1]
+        print('examined for mongo: documents/keys, from explain() on {} queries'.format(len(sample)))
+    report(latencies, examined, wall)
+
+
+if __name__ == "__main__":
+    main()
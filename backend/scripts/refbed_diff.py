@@ -0,0 +1,83 @@
+#!/usr/bin/python
+# usage: python3 refbed_diff.py <previous refbed> <new refbed> <output prefix>
+
+# compares two releases of the same converter output and writes only what changed:
+#   <output prefix>.upsert  new and changed records, same columns as the refbed
+#   <output prefix>.insert  all records of keys that are duplicated in either release
+#   <output prefix>.delete  id, chrom and txStart of records gone from the new release, and of
+#                           the duplicated keys that changed
+# records are keyed on id (transcript id), chrom and txStart since the same transcript can
+# be placed more than once (PAR genes, multiple alignments), so a moved transcript shows up
+# as one delete and one insert. content is compared through an md5 of the whole line.
+# the key is not unique in every release (susScr3, panTro4 and rheMac refGene have the same
+# transcript twice at one position), an upsert on it would fold those records into one, so a
+# duplicated key that changed is deleted as a whole and its records of the new release inserted.
+# either release can be '-' for stdin or compressed, see stream_io.py
+# load the result with: node setup/applyDiff.js <genome> <collection> <output prefix>
+
+import sys
+import hashlib
+from collections import defaultdict
+from stream_io import open_input
+
+
+def record_key(t):
+    return (t[7], t[0], t[1])
+
+
+def read_records(f):
+    '''{key: [line]}, lines in file order'''
+    records = defaultdict(list)
+    with open_input(f) as fin:
+        for line in fin:
+            line = line.rstrip('\n')
+            if not line:
+                continue
+            records[record_key(line.split('\t'))].append(line)
+    return records
+
+
+def read_hashes(f):
+    '''{key: sorted md5 of its lines}, the order of records under one key does not matter'''
+    return {key: sorted(hashlib.md5(line.encode()).digest() for line in lines)
+            for key, lines in read_records(f).items()}
+
+
+def main():
+    if len(sys.argv) != 4:
+        print('python3 refbed_diff.py <previous refbed> <new refbed> <output prefix>')
+        sys.exit()
+    old = read_hashes(sys.argv[1])
+    new = read_records(sys.argv[2])
+    inserted = changed = replaced = unchanged = 0
+    deleted = []
+    with open(sys.argv[3] + '.upsert', 'w') as upsert, open(sys.argv[3] + '.insert', 'w') as insert:
+        for key, lines in new.items():
+            hashes = old.pop(key, None)
+            if hashes == sorted(hashlib.md5(line.encode()).digest() for line in lines):
+                unchanged += len(lines)
+            elif hashes is not None and (len(hashes) > 1 or len(lines) > 1):
+                replaced += len(lines)
+                deleted.append(key)
+                insert.write(''.join(line + '\n' for line in lines))
+            else:
+                if hashes is None:
+                    inserted += len(lines)
+                else:
+                    changed += 1
+                if len(lines) > 1:
+                    insert.write(''.join(line + '\n' for line in lines))
+                else:
+                    upsert.write(lines[0] + '\n')
+    # whatever is left in the old release was not seen in the new one
+    removed = sum(len(hashes) for hashes in old.values())
+    deleted.extend(old)
+    with open(sys.argv[3] + '.delete', 'w') as fout:
+        for key in deleted:
+            fout.write('\t'.join(key) + '\n')
+    print('inserted: {}, changed: {}, replaced: {}, deleted: {}, unchanged: {}'.format(
+        inserted, changed, replaced, removed, unchanged))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+#!/usr/bin/python
+# usage: python3 shard_refbed.py <input refbed> <output dir>, '-' for stdin
+
+# splits an existing refbed into one file per chromosome sorted by txStart, plus a manifest.json,
+# for the parallel load in setup/mongoImporters.js. the converters write the same layout directly
+# when their output file name ends with /
+
+import sys
+from stream_io import open_input, ShardedWriter
+
+
+def main():
+    if len(sys.argv) != 3:
+        print('python3 shard_refbed.py <input refbed> <output dir>')
+        sys.exit()
+    with open_input(sys.argv[1]) as fin, ShardedWriter(sys.argv[2]) as fout:
+        for line in fin:
+            fout.write(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+#!/usr/bin/python
+# usage: shared input/output for the converters
+
+# open_input and open_output take a file name, or '-' for stdin/stdout, and return a text
+# stream so the converters can sit in a pipe like: download | convert | load
+# compressed input is detected from the first bytes, not the file name: gzip (which covers
+# BGZF and multi-member gzip) and zstd.
+# output is compressed by the file name: .gz/.bgz is written as BGZF, which any gzip reader
+# understands and bgzip/tabix can index, .zst is zstd.
+# zstd needs the zstandard package (or python 3.14 compression.zstd).
+# BGZF input is inflated block by block on a thread pool (zlib releases the GIL), with blocks
+# read ahead and handed back in order. other gzip input, which can not be split without
+# inflating it, is decompressed on a background thread while the converter parses.
+# an output name ending with / (or an existing directory) is written sharded by chromosome: one
+# file per chromosome sorted by txStart and a manifest.json listing them in chrom order, which
+# setup/mongoImporters.js loads in parallel. such a directory given as input is read back as the
+# shards one after the other.
+
+import io
+import os
+import re
+import json
+import queue
+import struct
+import sys
+import threading
+import zlib
+import gzip
+from collections import deque, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# BGZF block layout: https://samtools.github.io/hts-specs/SAMv1.pdf section 4.1
+BGZF_BLOCK_DATA = 0xff00  # uncompressed bytes per block, as bgzip uses
+BGZF_HEADER = b'\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00'
+BGZF_EOF = BGZF_HEADER + b'\x1b\x00\x03\x00\x00\x00\x00\x00\x00\x00\x00\x00'
+BGZF_BLOCKS_PER_TASK = 16  # ~1MB of output per thread pool task
+READ_CHUNK = 1 << 20
+DEFAULT_THREADS = min(4, os.cpu_count() or 1)
+MANIFEST = 'manifest.json'
+
+
+def _zstd():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        pass
+    try:
+        from compression import zstd
+        return zstd
+    except ImportError:
+        sys.exit('zstd streams need the zstandard package: pip install zstandard')
+
+
+class BgzfWriter(io.BufferedIOBase):
+    '''binary writer producing BGZF blocks, the EOF marker block is added on close'''
+
+    def __init__(self, fileobj, level=6, closefd=True):
+        self.fileobj = fileobj
+        self.level = level
+        self.closefd = closefd
+        self.buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer.extend(data)
+        while len(self.buffer) >= BGZF_BLOCK_DATA:
+            self._write_block(bytes(self.buffer[:BGZF_BLOCK_DATA]))
+            del self.buffer[:BGZF_BLOCK_DATA]
+        return len(data)
+
+    def _write_block(self, data):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        deflated = compressor.compress(data) + compressor.flush()
+        # BSIZE is the total block size minus 1, the header ends with the 2 bytes of BSIZE itself
+        self.fileobj.write(BGZF_HEADER + struct.pack('<H', len(BGZF_HEADER) + 2 + len(deflated) + 8 - 1))
+        self.fileobj.write(deflated)
+        self.fileobj.write(struct.pack('<II', zlib.crc32(data), len(data)))
+
+    def flush(self):
+        self.fileobj.flush()
+
+    def close(self):
+        if self.closed:
+            return
+        if self.buffer:
+            self._write_block(bytes(self.buffer))
+            self.buffer.clear()
+        self.fileobj.write(BGZF_EOF)
+        super().close()
+        if self.closefd:
+            self.fileobj.close()
+
+
+def is_bgzf(header):
+    '''whether the first bytes of a stream are a BGZF block header'''
+    if len(header) < 18 or header[:2] != GZIP_MAGIC or not header[3] & 4:
+        return False
+    return _bgzf_bsize(header[12:12 + struct.unpack('<H', header[10:12])[0]]) is not None
+
+
+def _bgzf_bsize(extra):
+    '''BSIZE from the gzip extra subfields of a BGZF block, None when there is no BC subfield'''
+    i = 0
+    while i + 4 <= len(extra):
+        slen = struct.unpack('<H', extra[i + 2:i + 4])[0]
+        if extra[i:i + 2] == b'BC' and slen == 2:
+            return struct.unpack('<H', extra[i + 4:i + 6])[0]
+        i += 4 + slen
+    return None
+
+
+def _inflate_blocks(blocks):
+    out = []
+    for block in blocks:
+        data = zlib.decompress(block[:-8], -15)
+        crc, isize = struct.unpack('<II', block[-8:])
+        if zlib.crc32(data) != crc or len(data) != isize:
+            raise OSError('BGZF block failed CRC check')
+        out.append(data)
+    return b''.join(out)
+
+
+class ParallelBgzfReader(io.RawIOBase):
+    '''binary reader inflating BGZF blocks on a thread pool, output keeps the block order'''
+
+    def __init__(self, fileobj, threads=DEFAULT_THREADS, closefd=True):
+        self.fileobj = fileobj
+        self.closefd = closefd
+        self.executor = ThreadPoolExecutor(threads)
+        self.readahead = threads * 2
+        self.pending = deque()
+        self.eof = False
+        self.buffer = memoryview(b'')
+        self.offset = 0
+
+    def readable(self):
+        return True
+
+    def _read_block(self):
+        header = self.fileobj.read(12)
+        if not header:
+            return None
+        if len(header) < 12 or header[:2] != GZIP_MAGIC or not header[3] & 4:
+            raise OSError('not a BGZF block')
+        xlen = struct.unpack('<H', header[10:12])[0]
+        extra = self.fileobj.read(xlen)
+        bsize = _bgzf_bsize(extra)
+        if bsize is None:
+            raise OSError('not a BGZF block')
+        # BSIZE is the total block size minus 1, the rest is deflated data, CRC32 and ISIZE
+        rest = self.fileobj.read(bsize + 1 - 12 - xlen)
+        if len(rest) != bsize + 1 - 12 - xlen:
+            raise EOFError('truncated BGZF block')
+        return rest
+
+    def _fill(self):
+        while not self.eof and len(self.pending) < self.readahead:
+            blocks = []
+            while len(blocks) < BGZF_BLOCKS_PER_TASK:
+                block = self._read_block()
+                if block is None:
+                    self.eof = True
+                    break
+                blocks.append(block)
+            if blocks:
+                self.pending.append(self.executor.submit(_inflate_blocks, blocks))
+
+    def readinto(self, b):
+        while self.offset >= len(self.buffer):
+            self._fill()
+            if not self.pending:
+                return 0
+            self.buffer = memoryview(self.pending.popleft().result())
+            self.offset = 0
+        n = min(len(b), len(self.buffer) - self.offset)
+        b[:n] = self.buffer[self.offset:self.offset + n]
+        self.offset += n
+        return n
+
+    def close(self):
+        if self.closed:
+            return
+        for future in self.pending:
+            future.cancel()
+        self.executor.shutdown(wait=True)
+        if self.closefd:
+            self.fileobj.close()
+        super().close()
+
+
+class ThreadedReader(io.RawIOBase):
+    '''binary reader that reads another stream ahead on a background thread'''
+
+    def __init__(self, stream, readahead=8):
+        self.stream = stream
+        self.queue = queue.Queue(readahead)
+        self.stop = threading.Event()
+        self.buffer = memoryview(b'')
+        self.offset = 0
+        self.eof = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def readable(self):
+        return True
+
+    def _put(self, item):
+        while not self.stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _run(self):
+        try:
+            while not self.stop.is_set():
+                data = self.stream.read(READ_CHUNK)
+                self._put(data)
+                if not data:
+                    return
+        except Exception as error:
+            self._put(error)
+
+    def readinto(self, b):
+        while self.offset >= len(self.buffer):
+            if self.eof:
+                return 0
+            item = self.queue.get()
+            if isinstance(item, Exception):
+                raise item
+            if not item:
+                self.eof = True
+                return 0
+            self.buffer = memoryview(item)
+            self.offset = 0
+        n = min(len(b), len(self.buffer) - self.offset)
+        b[:n] = self.buffer[self.offset:self.offset + n]
+        self.offset += n
+        return n
+
+    def close(self):
+        if self.closed:
+            return
+        self.stop.set()
+        self.thread.join()
+        self.stream.close()
+        super().close()
+
+
+class ShardedWriter(io.TextIOBase):
+    '''
+    refbed text split on the chromosome (first column) into a directory, lines are kept in memory
+    and written on close, each shard sorted by txStart (second column)
+    '''
+
+    def __init__(self, outdir):
+        super().__init__()
+        self.outdir = outdir
+        self.partial = ''
+        self.lines = defaultdict(list)
+
+    def writable(self):
+        return True
+
+    def write(self, s):
+        lines = (self.partial + s).split('\n')
+        self.partial = lines.pop()
+        for line in lines:
+            self._add(line)
+        return len(s)
+
+    def _add(self, line):
+        if line:
+            t = line.split('\t', 2)
+            self.lines[t[0]].append((int(t[1]), line))
+
+    def close(self):
+        if self.closed:
+            return
+        self._add(self.partial)
+        os.makedirs(self.outdir, exist_ok=True)
+        shards = []
+        names = set()
+        for chrom in sorted(self.lines):
+            rows = sorted(self.lines[chrom], key=lambda x: x[0])
+            # chromosome names can hold characters that do not belong in a file name
+            name = re.sub(r'[^\w.-]', '_', chrom)
+            while name in names:
+                name += '_'
+            names.add(name)
+            file = '{}.refbed'.format(name)
+            with open(os.path.join(self.outdir, file), 'w') as fout:
+                for _, line in rows:
+                    fout.write(line + '\n')
+            shards.append({'chrom': chrom, 'file': file, 'records': len(rows)})
+        with open(os.path.join(self.outdir, MANIFEST), 'w') as fout:
+            json.dump({'sortedBy': ['chrom', 'txStart'], 'shards': shards}, fout, indent=1)
+        super().close()
+
+
+def shard_files(indir):
+    '''shard file names of a sharded output directory, in manifest (chrom) order'''
+    with open(os.path.join(indir, MANIFEST)) as fin:
+        return [os.path.join(indir, shard['file']) for shard in json.load(fin)['shards']]
+
+
+class ConcatReader(io.RawIOBase):
+    '''reads a list of files one after the other'''
+
+    def __init__(self, files):
+        self.files = deque(files)
+        self.current = None
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while True:
+            if self.current is None:
+                if not self.files:
+                    return 0
+                self.current = open(self.files.popleft(), 'rb')
+            n = self.current.readinto(b)
+            if n:
+                return n
+            self.current.close()
+            self.current = None
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+        super().close()
+
+
+def open_input(f, threads=DEFAULT_THREADS):
+    '''
+    text stream over a file name or '-' for stdin, gzip/BGZF and zstd are decompressed
+    threads is the number of decompression threads for gzip input, 1 reads it on the calling thread
+    '''
+    if os.path.isdir(f):
+        return io.TextIOWrapper(io.BufferedReader(ConcatReader(shard_files(f)), READ_CHUNK), encoding='utf-8')
+    if f == '-':
+        raw = os.fdopen(sys.stdin.fileno(), 'rb', closefd=False)
+    else:
+        raw = open(f, 'rb')
+    magic = raw.peek(18)[:18]
+    if magic[:2] == GZIP_MAGIC:
+        if threads > 1 and is_bgzf(magic):
+            stream = io.BufferedReader(ParallelBgzfReader(raw, threads), READ_CHUNK)
+        else:
+            # GzipFile only closes the file object when it opened the file itself
+            if f == '-':
+                stream = gzip.GzipFile(fileobj=raw)
+            else:
+                raw.close()
+                stream = gzip.open(f, 'rb')
+            if threads > 1:
+                stream = io.BufferedReader(ThreadedReader(stream), READ_CHUNK)
+    elif magic[:4] == ZSTD_MAGIC:
+        stream = _zstd().open(raw, 'rb')
+    else:
+        stream = raw
+    return io.TextIOWrapper(stream, encoding='utf-8')
+
+
+def open_output(f):
+    '''text stream over a file name or '-' for stdout, compressed by the file extension, sharded for a directory'''
+    if f.endswith('/') or os.path.isdir(f):
+        return ShardedWriter(f)
+    zstd = _zstd() if f.endswith('.zst') else None
+    if f == '-':
+        sys.stdout.flush()
+        raw = os.fdopen(sys.stdout.fileno(), 'wb', closefd=False)
+    else:
+        raw = open(f, 'wb')
+    if f.endswith(('.gz', '.bgz')):
+        stream = BgzfWriter(raw)
+    elif zstd:
+        stream = zstd.open(raw, 'wb')
+    else:
+        stream = raw
+    return io.TextIOWrapper(stream, encoding='utf-8')
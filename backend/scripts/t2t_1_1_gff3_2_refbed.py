@@ -1,10 +1,12 @@
 #!/usr/bin/python
 # programmer : Daofeng
-# usage:
+# usage: python3 t2t_1_1_gff3_2_refbed.py <gff3 file> [output file, default <gff3 file>.refbed, or stdout for stdin], '-' for stdin/stdout
 
 # convert ncbi gff3 to refbed for browser
 
-import sys,gzip
+import sys
+from stream_io import open_input, open_output
+from exon_utils import merge_exons, cds_range, format_exons
 typeMap = {
     'IG_C_gene':'coding',
     'IG_D_gene':'coding',
@@ -56,11 +58,10 @@ typeMap = {
 def main():
     d = {}
     fin = sys.argv[1]
-    fout = '{}.refbed'.format(fin)
+    fout = sys.argv[2] if len(sys.argv) > 2 else '-' if fin == '-' else '{}.refbed'.format(fin)
     try:
-        with open(fin,"r") as infile:
-        # with gzip.open(fin,"rb") as infile:
-            with open(fout,'w') as outfile:
+        with open_input(fin) as infile:
+            with open_output(fout) as outfile:
                 for line in infile:
                     if line.startswith('#'): continue
                     line = line.strip()
@@ -85,22 +86,23 @@ def main():
                             newtype = typeMap[biotype]
                         else:
                             newtype = biotype
-                        d[dkey] = {'desc': t[8], 'strand': t[6], 'chrom': t[0], 'start': int(t[3])-1, 'end':t[4], 'symbol': symbol, 'exonstarts': [], 'exonends': [], 'cdsstart': int(t[3])-1, 'cdsend':t[4], 'type': newtype}
+                        d[dkey] = {'desc': t[8], 'strand': t[6], 'chrom': t[0], 'start': int(t[3])-1, 'end': int(t[4]), 'symbol': symbol, 'exonstarts': [], 'exonends': [], 'cdsstarts': [], 'cdsends': [], 'type': newtype}
                     elif t[2].lower() == 'cds' or t[2].lower() == 'exon':
                         dkey = details['Parent']
                         if dkey not in d:
-                            print(dkey, 'error')
+                            print(dkey, 'error', file=sys.stderr)
                             sys.exit(1)
                         else:
                             #print dkey,'out'
-                            d[dkey]['exonstarts'].append(str(int(t[3])-1))
-                            d[dkey]['exonends'].append(t[4])
+                            kind = 'cds' if t[2].lower() == 'cds' else 'exon'
+                            d[dkey][kind + 'starts'].append(int(t[3])-1)
+                            d[dkey][kind + 'ends'].append(int(t[4]))
                 for k in d:
                     v = d[k]
-                    outfile.write('{}\t{}\t{}\t{}\t{}\t{}\t{}\t{}\t{}\t'.format(v['chrom'], v['start'], v['end'], v['cdsstart'], v['cdsend'], v['strand'], v['symbol'], k.replace('gene-',''), v['type']))
-                    es = sorted(v['exonstarts'], key=lambda x:int(x))
-                    ee = sorted(v['exonends'], key=lambda x:int(x))
-                    outfile.write('{}\t{}\t{}\n'.format(','.join(es), ','.join(ee), v['desc']))
+                    cdsstart, cdsend = cds_range(v['cdsstarts'], v['cdsends'], v['end'])
+                    es, ee = format_exons(*merge_exons(v['exonstarts'] + v['cdsstarts'], v['exonends'] + v['cdsends']))
+                    outfile.write('{}\t{}\t{}\t{}\t{}\t{}\t{}\t{}\t{}\t'.format(v['chrom'], v['start'], v['end'], cdsstart, cdsend, v['strand'], v['symbol'], k.replace('gene-',''), v['type']))
+                    outfile.write('{}\t{}\t{}\n'.format(es, ee, v['desc']))
                     # outfile.write('{}\t{}\n'.format(','.join(es), ','.join(ee)))
                         
     except IOError as message:
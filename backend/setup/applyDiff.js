@@ -0,0 +1,63 @@
+"use strict";
+
+const MongoImporter = require("./mongoImporters");
+const mongoUtils = require("../mongoUtils");
+const genomeConfig = require("./genomeConfig");
+
+const MONGO_URL = "mongodb://localhost:27017";
+const DATA_DIR = "genomeData";
+const ExitCodes = {
+    USAGE_ERROR: 1,
+    MONGO_CONNECT_ERROR: 2,
+    IMPORT_ERROR: 3,
+};
+
+/**
+ * Applies an annotation release diff made by scripts/refbed_diff.py to one gene collection.
+ * Usage: node setup/applyDiff.js <genome> <collection> <diff prefix>
+ *
+ * @return {Promise<number>} exit code
+ */
+async function main() {
+    const [genome, collectionName, diffPrefix] = process.argv.slice(2);
+    const config = (genomeConfig[genome] || []).find((entry) => entry.name === collectionName);
+    if (!diffPrefix || !config) {
+        console.error("Usage: node setup/applyDiff.js <genome> <collection> <diff prefix>");
+        console.error("The genome and collection must be listed in setup/genomeConfig.js");
+        return ExitCodes.USAGE_ERROR;
+    }
+
+    let mongoClient;
+    try {
+        mongoClient = await mongoUtils.getMongoClient(MONGO_URL);
+    } catch (error) {
+        console.error(error.toString());
+        console.error("Couldn't establish a MongoDB connection; aborting...");
+        return ExitCodes.MONGO_CONNECT_ERROR;
+    }
+
+    try {
+        const importer = new MongoImporter(
+            DATA_DIR,
+            genome,
+            mongoClient.db(genome),
+            config.name,
+            config.file,
+            config.fieldsConfig.fields,
+            config.fieldsConfig.indexFields
+        );
+        await importer.applyDiff(diffPrefix);
+    } catch (error) {
+        console.error(error.toString());
+        console.error(`Error applying diff to ${genome}.${collectionName}.  Aborting...`);
+        return ExitCodes.IMPORT_ERROR;
+    }
+
+    console.log(`${genome}.${collectionName}: done`);
+    return 0;
+}
+
+if (require.main === module) {
+    // Called directly
+    main().then(process.exit);
+} // else required as a module
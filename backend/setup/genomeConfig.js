@@ -27,6 +27,18 @@ const geneFieldsAndIndex = {
     ],
 };
 
+// For files packed with scripts/exon_codec.py: exonStarts and exonEnds are replaced by one `exons` column.  To load
+// one, list it for its genome below like any other gene file, with this fields config:
+//     { name: "refGene", file: "refGene.packed.refbed", fieldsConfig: packedGeneFieldsAndIndex }
+// setupMongo.js and scripts/gene_server.py read the field names from here, the browser decodes the column.
+const PACKED_GENE_FIELDS =
+    "chrom,txStart,txEnd,cdsStart,cdsEnd,strand,name,id,transcriptionClass,exons,description";
+
+const packedGeneFieldsAndIndex = {
+    fields: PACKED_GENE_FIELDS,
+    indexFields: geneFieldsAndIndex.indexFields,
+};
+
 const hg19 = [
     {
         name: "refGene",
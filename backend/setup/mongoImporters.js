@@ -2,9 +2,28 @@
 
 const child_process = require('child_process');
 const fs = require('fs');
+const os = require('os');
+const util = require('util');
+
+const exec = util.promisify(child_process.exec);
 
 const isWin = process.platform === 'win32';
 const MONGO_IMPORT = isWin ? '"c:\\Program Files\\MongoDB\\Server\\3.6\\bin\\mongoimport.exe"' : 'mongoimport';
+const DIFF_KEY_FIELDS = ['id', 'chrom', 'txStart']; // Record key used by scripts/refbed_diff.py
+const DELETE_BATCH_SIZE = 1000;
+const SHARD_MANIFEST = 'manifest.json'; // Sharded output of scripts/stream_io.py
+const SHARD_IMPORTS = os.cpus().length; // Number of mongoimport processes for sharded data
+const NAMESPACE_NOT_FOUND = 26; // Error code of dropping a collection that does not exist
+
+/**
+ * Converts a TSV value the way mongoimport does, so numeric looking values match the imported numbers.
+ *
+ * @param {string} value - raw value from a TSV file
+ * @return {string|number} value as stored by mongoimport
+ */
+function toImportedValue(value) {
+    return value !== '' && !Number.isNaN(Number(value)) ? Number(value) : value;
+}
 
 /**
  * An importer of data for MongoDB
@@ -33,7 +52,10 @@ class MongoImporter {
     }
 
     async importAndIndex() {
-        if (fs.existsSync(this.sourceFile)) {
+        const manifestFile = `${this.sourceFile}/${SHARD_MANIFEST}`;
+        if (fs.existsSync(manifestFile)) {
+            await this.importShards(JSON.parse(fs.readFileSync(manifestFile, 'utf8')));
+        } else if (fs.existsSync(this.sourceFile)) {
             child_process.execSync(
                 `${MONGO_IMPORT} -d ${this.genomeName} -c ${this.name} --drop ` +
                     `--file ${this.sourceFile} --type tsv ` +
@@ -48,6 +70,94 @@ class MongoImporter {
             console.error(`Error: file ${this.sourceFile} not exists!!`);
         }
     }
+
+    /**
+     * Imports a directory of per chromosome shards, each sorted by txStart, as written by the converters when given
+     * an output directory.  The indexes are created on the empty collection first and the shards are imported in
+     * manifest (chrom) order by up to one mongoimport per core, so index entries are added in near key order and
+     * the load scales with the number of shards that run at once.
+     *
+     * @param {object} manifest - parsed manifest.json of the shard directory
+     * @return {Promise<void>} promise that resolves when all shards are imported
+     */
+    async importShards(manifest) {
+        const collection = this.database.collection(this.name);
+        try {
+            await collection.drop();
+        } catch (error) {
+            if (error.code !== NAMESPACE_NOT_FOUND) {
+                throw error;
+            }
+        }
+        for (const index of this.indexFields) {
+            await collection.createIndex(index);
+        }
+        const shards = manifest.shards.slice();
+        const importNext = async () => {
+            while (shards.length > 0) {
+                const shard = shards.shift();
+                await exec(
+                    `${MONGO_IMPORT} -d ${this.genomeName} -c ${this.name} ` +
+                        `--file ${this.sourceFile}/${shard.file} --type tsv ` +
+                        `-f ${this.fields}`
+                );
+            }
+        };
+        const workers = [];
+        for (let i = 0; i < Math.min(SHARD_IMPORTS, shards.length); i++) {
+            workers.push(importNext());
+        }
+        await Promise.all(workers);
+    }
+
+    /**
+     * Applies a release diff made by scripts/refbed_diff.py without dropping the collection, so it stays
+     * queryable during the load.  New and changed records are upserted first, then removed records are deleted.
+     * Keys that are not unique (the same transcript twice at one position) can not be upserted, those are deleted
+     * as a whole with the removed records and their new records inserted last.
+     *
+     * @param {string} diffPrefix - output prefix given to refbed_diff.py
+     * @return {Promise<void>} promise that resolves when the diff is applied
+     */
+    async applyDiff(diffPrefix) {
+        const upsertFile = `${diffPrefix}.upsert`;
+        const insertFile = `${diffPrefix}.insert`;
+        const deleteFile = `${diffPrefix}.delete`;
+        if (![upsertFile, insertFile, deleteFile].every(file => fs.existsSync(file))) {
+            console.error(`Error: diff files ${upsertFile}, ${insertFile} and ${deleteFile} not exist!!`);
+            return;
+        }
+        if (fs.statSync(upsertFile).size > 0) {
+            child_process.execSync(
+                `${MONGO_IMPORT} -d ${this.genomeName} -c ${this.name} ` +
+                    `--mode upsert --upsertFields ${DIFF_KEY_FIELDS.join(',')} ` +
+                    `--file ${upsertFile} --type tsv ` +
+                    `-f ${this.fields} ` +
+                    '--numInsertionWorkers 4'
+            );
+        }
+        const collection = this.database.collection(this.name);
+        const lines = fs.readFileSync(deleteFile, 'utf8').split('\n').filter(line => line);
+        for (let i = 0; i < lines.length; i += DELETE_BATCH_SIZE) {
+            const operations = lines.slice(i, i + DELETE_BATCH_SIZE).map(line => {
+                const filter = {};
+                line.split('\t').forEach((value, j) => filter[DIFF_KEY_FIELDS[j]] = toImportedValue(value));
+                return { deleteMany: { filter } };
+            });
+            await collection.bulkWrite(operations, { ordered: false });
+        }
+        if (fs.statSync(insertFile).size > 0) {
+            child_process.execSync(
+                `${MONGO_IMPORT} -d ${this.genomeName} -c ${this.name} ` +
+                    `--file ${insertFile} --type tsv ` +
+                    `-f ${this.fields} ` +
+                    '--numInsertionWorkers 4'
+            );
+        }
+        for (const index of this.indexFields) {
+            await collection.createIndex(index);
+        }
+    }
 }
 
 module.exports = MongoImporter;
@@ -3,6 +3,7 @@ import ChromosomeInterval from "./interval/ChromosomeInterval";
 import _ from "lodash";
 import OpenInterval from "./interval/OpenInterval";
 import { FeatureSegment } from "./interval/FeatureSegment";
+import { decodeExons } from "./exonCodec";
 
 export interface IdbRecord {
     id: string;
@@ -13,8 +14,9 @@ export interface IdbRecord {
     txEnd: number;
     cdsStart: number;
     cdsEnd: number;
-    exonStarts: string;
-    exonEnds: string;
+    exonStarts?: string;
+    exonEnds?: string;
+    exons?: string; // Packed exonStarts and exonEnds, see exonCodec.ts
     transcriptionClass?: string;
     description?: string;
     collection?: string;
@@ -73,22 +75,30 @@ class Gene extends Feature {
      * Parses `this.dbRecord` and sets `this._translated` and `this._utrs`.
      */
     _parseDetails() {
-        const { cdsStart, cdsEnd, exonStarts, exonEnds } = this.dbRecord;
+        const { txStart, cdsStart, cdsEnd, exonStarts, exonEnds, exons: packedExons } = this.dbRecord;
         this._translated = [];
         this._utrs = [];
         // tslint:disable-next-line:triple-equals
-        if ([cdsStart, cdsEnd, exonStarts, exonEnds].some((value) => value === undefined)) {
+        if ([cdsStart, cdsEnd].some((value) => value === undefined)) {
+            return;
+        }
+
+        let exons: OpenInterval[];
+        if (packedExons !== undefined) {
+            exons = decodeExons(txStart, String(packedExons));
+        } else if (exonStarts !== undefined && exonEnds !== undefined) {
+            const parsedExonStarts = _.trim(exonStarts, ",")
+                .split(",")
+                .map((n) => Number.parseInt(n, 10));
+            const parsedExonEnds = _.trim(exonEnds, ",")
+                .split(",")
+                .map((n) => Number.parseInt(n, 10));
+            exons = _.zip(parsedExonStarts, parsedExonEnds).map(([start, end]) => new OpenInterval(start, end));
+        } else {
             return;
         }
 
         const codingInterval = new OpenInterval(cdsStart, cdsEnd);
-        const parsedExonStarts = _.trim(exonStarts, ",")
-            .split(",")
-            .map((n) => Number.parseInt(n, 10));
-        const parsedExonEnds = _.trim(exonEnds, ",")
-            .split(",")
-            .map((n) => Number.parseInt(n, 10));
-        const exons = _.zip(parsedExonStarts, parsedExonEnds).map(([start, end]) => new OpenInterval(start, end));
 
         for (const exon of exons) {
             // Get UTRs and translated exons from the raw record
@@ -0,0 +1,40 @@
+import OpenInterval from "./interval/OpenInterval";
+
+const PREFIX = "~"; // Keeps the value from being imported as a number, see exon_codec.py
+
+/**
+ * Decodes the packed `exons` field of gene records made by backend/scripts/exon_codec.py.  Each exon is two base64
+ * encoded varints: the zigzag encoded distance from the end of the previous exon (from txStart for the first one) and
+ * the exon length, after a "~" prefix.
+ *
+ * @param {number} txStart - transcript start of the gene record
+ * @param {string} packed - the packed `exons` field
+ * @return {OpenInterval[]} exons in the order they were encoded
+ */
+export function decodeExons(txStart: number, packed: string): OpenInterval[] {
+    const bytes = atob(packed.startsWith(PREFIX) ? packed.slice(PREFIX.length) : packed);
+    const exons: OpenInterval[] = [];
+    let index = 0;
+    const readVarint = () => {
+        let value = 0;
+        let multiplier = 1;
+        let byte: number;
+        do {
+            byte = bytes.charCodeAt(index);
+            index++;
+            value += (byte & 0x7f) * multiplier;
+            multiplier *= 128;
+        } while (byte & 0x80);
+        return value;
+    };
+
+    let previousEnd = txStart;
+    while (index < bytes.length) {
+        const zigzag = readVarint();
+        const start = previousEnd + (zigzag % 2 === 0 ? zigzag / 2 : -(zigzag + 1) / 2);
+        const end = start + readVarint();
+        exons.push(new OpenInterval(start, end));
+        previousEnd = end;
+    }
+    return exons;
+}
@@ -45,3 +45,18 @@ it('gets exons and utrs correctly', () => {
         new OpenInterval(800, 1000),
     ]);
 });
+
+it('gets exons and utrs from packed exons', () => {
+    // exon_codec.py encode of txStart 0, exonStarts "0,400,700", exonEnds "300,600,1000"
+    const { exonStarts, exonEnds, ...rest } = RECORD;
+    let instance = new Gene({ ...rest, exons: "~AKwCyAHIAcgBrAI=" });
+    expect(instance.translated).toEqual([
+        new OpenInterval(200, 300),
+        new OpenInterval(400, 600),
+        new OpenInterval(700, 800)
+    ]);
+    expect(instance.utrs).toEqual([
+        new OpenInterval(0, 200),
+        new OpenInterval(800, 1000),
+    ]);
+});